@@ -1,29 +1,99 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryNotReady
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import aiohttp_client, config_entry_oauth2_flow
-
-from .const import DOMAIN, shared_data
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import aiohttp_client, config_entry_oauth2_flow, device_registry as dr, entity_registry as er
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SAMPLE_HISTORY_HOURS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SAMPLE_HISTORY_HOURS,
+    DOMAIN,
+    LEGACY_UNIQUE_ID_PREFIXES,
+    REALTIME_UPDATE_INTERVAL,
+    SETUP_SYSTEMS_TIMEOUT,
+    SYSTEM_POLL_STAGGER,
+)
 from . import api
-from .coordinator import SunPowerFullCoordinator, SunPowerRealtimeCoordinator, SunPowerPeriodicCoordinator
+from .coordinator import FreshnessRegistry, SunPowerFullCoordinator, SunPowerRealtimeCoordinator, SunPowerPeriodicCoordinator
 from .config_flow import OptionsFlowHandler
+from .models import SYSTEM_DATA_DEFAULTS, load_system_data
+from .samples import PowerSampleBuffer
+from .snapshot import SunPowerSnapshot
+from .statistics import SunPowerStatistics
+from .store import SystemStore
 
 _LOGGER = logging.getLogger(__name__)
 
 _PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+_COORDINATORS = ("full", "realtime", "periodic")
+
 type SunPowerConfigEntry = ConfigEntry[SunPowerFullCoordinator]
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
+    # Token refreshes also update the entry; only option changes need a reload
+    if entry.options == hass.data[DOMAIN][entry.entry_id]["options"]:
+        return
     _LOGGER.debug("Options updated; reloading config entry.")
     await hass.config_entries.async_reload(entry.entry_id)
 
 
+async def _async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry, system_sn: str) -> None:
+    """Prefix single-system unique IDs with the serial of the first system."""
+
+    @callback
+    def _migrate(entity_entry: er.RegistryEntry) -> dict | None:
+        if entity_entry.unique_id.startswith(LEGACY_UNIQUE_ID_PREFIXES):
+            return {"new_unique_id": f"{system_sn}_{entity_entry.unique_id}"}
+        return None
+
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate)
+
+
+def _device_info(store: SystemStore) -> DeviceInfo:
+    """Build the device info shared by every entity of a system."""
+    system_sn = store["system_sn"]
+    details = store["details"]
+    return DeviceInfo(
+        identifiers={(DOMAIN, system_sn)},
+        manufacturer="SunPower",
+        name=f"SunPower System {system_sn}",
+        model=details.inverter_model,
+        sw_version=details.inv_version,
+    )
+
+
+@callback
+def _async_track_firmware(hass: HomeAssistant, system: dict) -> CALLBACK_TYPE:
+    """Update the device when the details report new firmware; return the unsubscribe."""
+    store: SystemStore = system["store"]
+    device_info: DeviceInfo = system["device_info"]
+
+    @callback
+    def _async_check_firmware() -> None:
+        details = store["details"]
+        if details.inv_version is None or details.inv_version == device_info.get("sw_version"):
+            return
+        device_info["sw_version"] = details.inv_version
+        device_info["model"] = details.inverter_model
+        registry = dr.async_get(hass)
+        if (device := registry.async_get_device(identifiers=device_info["identifiers"])) is not None:
+            registry.async_update_device(
+                device.id, sw_version=details.inv_version, model=details.inverter_model
+            )
+
+    # Only notified when the details changed
+    return system["full"].async_add_listener(_async_check_firmware, "details")
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up SunPower Maxeon from a config entry."""
     implementation = await config_entry_oauth2_flow.async_get_config_entry_implementation(hass, entry)
@@ -33,33 +103,121 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         aiohttp_client.async_get_clientsession(hass), session
     )
 
-    # Create all coordinators
-    full_coordinator = SunPowerFullCoordinator(hass, auth, shared_data)
-    realtime_coordinator = SunPowerRealtimeCoordinator(hass, auth, shared_data)
-    periodic_coordinator = SunPowerPeriodicCoordinator(hass, auth, shared_data)
-
-    try:
-        await full_coordinator.async_config_entry_first_refresh()
-        await realtime_coordinator.async_config_entry_first_refresh()
-        await periodic_coordinator.async_config_entry_first_refresh()
+    max_concurrency = entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    sample_capacity = int(
+        entry.options.get(CONF_SAMPLE_HISTORY_HOURS, DEFAULT_SAMPLE_HISTORY_HOURS)
+        * 3600 / REALTIME_UPDATE_INTERVAL.total_seconds()
+    )
 
-        if not shared_data.get("system_sn"):
+    # Start from the data saved before the last restart when there is some,
+    # without waiting for the API: the system list is checked once set up,
+    # and the entry reloaded when the account gained systems
+    snapshot = SunPowerSnapshot(hass, entry.entry_id)
+    restored = await snapshot.async_load()
+
+    if restored:
+        system_sns = list(restored)
+    else:
+        try:
+            async with asyncio.timeout(SETUP_SYSTEMS_TIMEOUT):
+                systems = await auth.async_get_systems()
+        except Exception as err:
+            raise ConfigEntryNotReady(f"Error connecting to SunPower API: {err}") from err
+        if systems is api.SYSTEMS_ENDPOINT.fallback:
+            raise ConfigEntryNotReady("SunPower API returned no system list")
+        system_sns = [system.system_sn for system in systems]
+        if not system_sns:
             raise ConfigEntryNotReady("No systems found in SunPower account.")
 
-    except Exception as err:
-        raise ConfigEntryNotReady(f"Error connecting to SunPower API: {err}") from err
+    await _async_migrate_unique_ids(hass, entry, system_sns[0])
+
+    # Spread the systems' refreshes over one realtime interval. The fixed
+    # intervals reschedule relative to the last refresh, so the offsets
+    # carry over; the realtime polls follow the backend's sample clock and
+    # add the offset to every aligned delay instead
+    stagger = min(SYSTEM_POLL_STAGGER, REALTIME_UPDATE_INTERVAL / len(system_sns))
+
+    # Create one set of coordinators per system, all sharing the same
+    # concurrency cap so N systems never exceed it together, and the same
+    # registry so no endpoint is fetched twice within a coordinator interval
+    registry = FreshnessRegistry()
+    coordinators = {}
+    for index, system_sn in enumerate(system_sns):
+        store = SystemStore(
+            {**SYSTEM_DATA_DEFAULTS, **load_system_data(restored.get(system_sn, {})), "system_sn": system_sn}
+        )
+        samples = PowerSampleBuffer(sample_capacity)
+        coordinators[system_sn] = {
+            "full": SunPowerFullCoordinator(hass, auth, store, semaphore, registry),
+            "realtime": SunPowerRealtimeCoordinator(
+                hass, auth, store, semaphore, registry, samples, poll_offset=index * stagger
+            ),
+            "periodic": SunPowerPeriodicCoordinator(hass, auth, store, semaphore, registry),
+            "store": store,
+            "samples": samples,
+            "device_info": _device_info(store),
+        }
+        snapshot.async_track(system_sn, store)
+
+    async def _async_refresh_system(index: int, system: dict) -> None:
+        await asyncio.sleep(index * stagger.total_seconds())
+        # The freshness registry lets the three share each endpoint fetch
+        await asyncio.gather(*(system[key].async_refresh() for key in _COORDINATORS))
+
+    async def _async_refresh_all() -> None:
+        await asyncio.gather(
+            *(
+                _async_refresh_system(index, system)
+                for index, system in enumerate(coordinators.values())
+            )
+        )
+
+    async def _async_check_systems() -> None:
+        """Reload the entry when the account has systems it does not poll yet."""
+        try:
+            systems = await auth.async_get_systems()
+        except Exception as err:
+            _LOGGER.debug("Could not check the system list: %s", err)
+            return
+        if systems is api.SYSTEMS_ENDPOINT.fallback:
+            return
+        if added := {system.system_sn for system in systems} - set(system_sns):
+            _LOGGER.info("Systems added to the account: %s; reloading", ", ".join(sorted(added)))
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    if restored:
+        for system in coordinators.values():
+            for key in _COORDINATORS:
+                system[key].async_restore()
+
+    # Unload callbacks run last-registered first, so the flush runs after
+    # the save listeners are gone
+    entry.async_on_unload(snapshot.async_flush)
+    for system in coordinators.values():
+        for key in _COORDINATORS:
+            entry.async_on_unload(system[key].async_add_listener(snapshot.async_schedule_save))
+        entry.async_on_unload(_async_track_firmware(hass, system))
 
     # Store coordinators in hass.data
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
-        "full": full_coordinator,
-        "realtime": realtime_coordinator,
-        "periodic": periodic_coordinator,
-        "shared_data": shared_data,
+        "api": auth,
+        "systems": coordinators,
+        "options": dict(entry.options),
     }
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
+    entry.async_on_unload(auth.async_start_token_refresh())
+    for system_sn, system in coordinators.items():
+        statistics = SunPowerStatistics(hass, system_sn, system["samples"])
+        entry.async_on_unload(statistics.async_start())
 
+    # Entities show restored data until the first refreshes complete; a
+    # failing endpoint only leaves its own entities waiting for the next cycle
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
+    entry.async_create_background_task(hass, _async_refresh_all(), f"{DOMAIN} first refresh")
+    if restored:
+        entry.async_create_background_task(hass, _async_check_systems(), f"{DOMAIN} system list")
     return True
 
 
@@ -69,4 +227,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: SunPowerConfigEntry) ->
     unload_ok = await hass.config_entries.async_unload_platforms(entry, _PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved snapshot when the entry is removed."""
+    await SunPowerSnapshot(hass, entry.entry_id).async_remove()
\ No newline at end of file
@@ -1,12 +1,150 @@
+import asyncio
 import logging
-from aiohttp import ClientSession, ClientResponseError
+import random
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from functools import partial
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientResponseError, ClientTimeout
+from homeassistant.core import CALLBACK_TYPE, callback
 from homeassistant.helpers import config_entry_oauth2_flow
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 
-from .const import SYSTEMS, SYSTEM_DETAILS, POWER_METER, ENERGY_METER, CHARGING_SCHEDULE, DISCHARGING_SCHEDULE, EXPORT_LIMIT
+from .const import (
+    API_BASE_URL,
+    DOMAIN,
+    DEFAULT_REQUEST_RETRIES,
+    DEFAULT_REQUEST_TIMEOUT,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    SETTINGS_CACHE_TTL,
+    SYSTEMS_CACHE_TTL,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_REFRESH_RETRY,
+    SYSTEMS,
+    SYSTEM_DETAILS,
+    POWER_METER,
+    ENERGY_METER,
+    CHARGING_SCHEDULE,
+    DISCHARGING_SCHEDULE,
+    EXPORT_LIMIT,
+)
+from .metrics import ApiMetrics, RequestRecord
+from .models import (
+    BatteryUps,
+    ChargingSchedule,
+    DischargingSchedule,
+    EnergyMeter,
+    ExportLimit,
+    PowerMeter,
+    System,
+    parse_systems,
+)
+from .rate_limiter import PRIORITY_READ, PRIORITY_WRITE, RateLimiter
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
+class Endpoint:
+    """Describe how to call one Maxeon API endpoint."""
+
+    name: str
+    path: str
+    method: str = "GET"
+    # Turns the JSON body into a model; raises SchemaError if it does not fit
+    parse: Callable[[Any], Any] | None = None
+    fallback: Any = None
+    timeout: float = DEFAULT_REQUEST_TIMEOUT
+    retries: int = DEFAULT_REQUEST_RETRIES
+    cache_ttl: timedelta | None = None
+
+    def url(self, system_sn: str | None) -> str:
+        """Return the absolute URL for a system."""
+        return API_BASE_URL + self.path.format(system_sn=system_sn)
+
+    @property
+    def metrics_key(self) -> str:
+        """Return the key of the endpoint in the API metrics."""
+        return f"{self.method} {self.name}"
+
+
+@dataclass(slots=True)
+class _CachedResponse:
+    """The last good GET response, kept for reuse, revalidation and errors."""
+
+    data: Any
+    fetched_at: float
+    received_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    stale: bool = False
+
+
+SYSTEMS_ENDPOINT = Endpoint("systems", "/systems", parse=parse_systems, fallback=parse_systems(SYSTEMS), cache_ttl=SYSTEMS_CACHE_TTL)
+DETAILS_ENDPOINT = Endpoint("details", "/systems/{system_sn}", parse=System.from_dict, fallback=System.from_dict(SYSTEM_DETAILS["default"]), cache_ttl=SYSTEMS_CACHE_TTL)
+POWER_METER_ENDPOINT = Endpoint("power_meter", "/systems/{system_sn}/power_meter", parse=PowerMeter.from_dict, fallback=PowerMeter.from_dict(POWER_METER), timeout=10, retries=1)
+ENERGY_METER_ENDPOINT = Endpoint("energy_meter", "/systems/{system_sn}/energy_meter", parse=EnergyMeter.from_dict, fallback=EnergyMeter.from_dict(ENERGY_METER))
+BATTERY_UPS_ENDPOINT = Endpoint("battery_ups", "/systems/{system_sn}/battery_ups", parse=BatteryUps.from_dict, fallback=BatteryUps(enable=False), cache_ttl=SETTINGS_CACHE_TTL)
+CHARGING_SCHEDULE_ENDPOINT = Endpoint("charging_schedule", "/systems/{system_sn}/charging_schedule", parse=ChargingSchedule.from_dict, fallback=ChargingSchedule.from_dict(CHARGING_SCHEDULE), cache_ttl=SETTINGS_CACHE_TTL)
+DISCHARGING_SCHEDULE_ENDPOINT = Endpoint("discharging_schedule", "/systems/{system_sn}/discharging_schedule", parse=DischargingSchedule.from_dict, fallback=DischargingSchedule.from_dict(DISCHARGING_SCHEDULE), cache_ttl=SETTINGS_CACHE_TTL)
+EXPORT_LIMIT_ENDPOINT = Endpoint("export_limit", "/systems/{system_sn}/export_limit", parse=ExportLimit.from_dict, fallback=ExportLimit.from_dict(EXPORT_LIMIT), cache_ttl=SETTINGS_CACHE_TTL)
+
+_GET_ENDPOINTS = {
+    endpoint.name: endpoint
+    for endpoint in (
+        SYSTEMS_ENDPOINT,
+        DETAILS_ENDPOINT,
+        POWER_METER_ENDPOINT,
+        ENERGY_METER_ENDPOINT,
+        BATTERY_UPS_ENDPOINT,
+        CHARGING_SCHEDULE_ENDPOINT,
+        DISCHARGING_SCHEDULE_ENDPOINT,
+        EXPORT_LIMIT_ENDPOINT,
+    )
+}
+
+
+# Returned by _async_send for a GET overtaken by a write of the same URL
+_SUPERSEDED = object()
+
+
+def is_fallback(endpoint_name: str, data: Any) -> bool:
+    """Return True if `data` is the built-in payload served for an endpoint that never answered.
+
+    Copies restored from a snapshot are recognized by their dummy status.
+    """
+    return data is _GET_ENDPOINTS[endpoint_name].fallback or getattr(data, "status", None) == "dummy_data"
+
+
+SET_BATTERY_UPS_ENDPOINT = Endpoint("battery_ups", "/systems/{system_sn}/battery_ups", method="PUT")
+SET_CHARGING_SCHEDULE_ENDPOINT = Endpoint("charging_schedule", "/systems/{system_sn}/charging_schedule", method="PUT")
+SET_DISCHARGING_SCHEDULE_ENDPOINT = Endpoint("discharging_schedule", "/systems/{system_sn}/discharging_schedule", method="PUT")
+SET_EXPORT_LIMIT_ENDPOINT = Endpoint("export_limit", "/systems/{system_sn}/export_limit", method="PUT")
+
+
+def _parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """Return the Retry-After delay in seconds, if the server sent one."""
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
 class AsyncConfigEntryAuth:
     """Handle authenticated communication with the SunPower Maxeon API."""
 
@@ -14,248 +152,368 @@ class AsyncConfigEntryAuth:
         self,
         websession: ClientSession,
         oauth_session: config_entry_oauth2_flow.OAuth2Session,
+        limiter: RateLimiter | None = None,
     ) -> None:
         self._websession = websession
         self._oauth_session = oauth_session
+        self._limiter = limiter or RateLimiter(REQUEST_RATE, REQUEST_BURST)
+        self._token: str | None = None
+        self._headers: dict[str, str] = {}
+        self._token_lock = asyncio.Lock()
+        self._unsub_token_refresh: CALLBACK_TYPE | None = None
+        self._cache: dict[str, _CachedResponse] = {}
+        # Bumped by every invalidation, per URL and for the whole cache
+        self._generations: dict[str, int] = {}
+        self._cache_epoch = 0
+        self._revalidating: set[str] = set()
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        self.metrics = ApiMetrics()
 
     async def async_get_access_token(self) -> str:
-        """Ensure the OAuth token is valid and return the access token."""
-        await self._oauth_session.async_ensure_token_valid()
-        return self._oauth_session.token["access_token"]
+        """Return a valid access token, refreshing it only when it has expired.
 
-    async def async_get_systems(self) -> dict:
-        """Fetch list of systems from the SunPower Maxeon API."""
-        token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = "https://api.sunpower.maxeon.com/v1/systems"
+        Concurrent callers share a single refresh through the token lock.
+        """
+        if self._oauth_session.valid_token:
+            return self._oauth_session.token["access_token"]
 
-        try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received systems: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning("Received 404, returning dummy systems data")
-                return {"systems": SYSTEMS.get("systems", [])}
-            raise
-        except Exception as err:
-            _LOGGER.error("Failed to fetch systems: %s", err)
-            return {"systems": SYSTEMS.get("systems", [])}
+        async with self._token_lock:
+            await self._oauth_session.async_ensure_token_valid()
+            return self._oauth_session.token["access_token"]
 
-    async def async_get_system_details(self, system_sn: str) -> dict:
-        """Fetch system details for a specific system by serial number."""
-        token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}"
+    async def _async_refresh_token(self) -> None:
+        """Renew the token now, even if it is still valid."""
+        session = self._oauth_session
+        async with self._token_lock:
+            new_token = await session.implementation.async_refresh_token(session.token)
+            session.hass.config_entries.async_update_entry(
+                session.config_entry, data={**session.config_entry.data, "token": new_token}
+            )
 
+    @callback
+    def async_start_token_refresh(self) -> CALLBACK_TYPE:
+        """Renew the token in the background shortly before it expires.
+
+        Returns a callback that stops the background refresh.
+        """
+        self._schedule_token_refresh()
+        return self._cancel_token_refresh
+
+    @callback
+    def _schedule_token_refresh(self, delay: float | None = None) -> None:
+        if delay is None:
+            expires_at = self._oauth_session.token.get("expires_at", 0)
+            delay = max(expires_at - time.time() - TOKEN_REFRESH_MARGIN.total_seconds(), 0)
+        self._unsub_token_refresh = async_call_later(
+            self._oauth_session.hass, delay, self._handle_token_refresh
+        )
+
+    async def _handle_token_refresh(self, _now) -> None:
         try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received systems data: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"System {system_sn} not found,(HTTP {err.status}), returning dummy data")
-                return SYSTEM_DETAILS.get("default", {})
-            raise
+            await self._async_refresh_token()
         except Exception as err:
-            _LOGGER.error("Failed to fetch system details: %s", err)
-            return SYSTEM_DETAILS.get("default", {})
+            _LOGGER.warning("Background token refresh failed, retrying later: %s", err)
+            self._schedule_token_refresh(TOKEN_REFRESH_RETRY.total_seconds())
+            return
+        self._schedule_token_refresh()
 
-    async def async_get_system_power(self, system_sn: str) -> dict:
-        """Fetch system power data from the power meter endpoint."""
+    @callback
+    def _cancel_token_refresh(self) -> None:
+        if self._unsub_token_refresh is not None:
+            self._unsub_token_refresh()
+            self._unsub_token_refresh = None
+
+    async def _async_get_headers(self) -> dict[str, str]:
+        """Return the request headers, rebuilt only when the token changes."""
         token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/power_meter"
+        if token != self._token:
+            self._token = token
+            self._headers = {"Authorization": f"Bearer {token}"}
+        return self._headers
+
+    async def _async_request(
+        self,
+        endpoint: Endpoint,
+        system_sn: str | None = None,
+        payload: dict | None = None,
+    ) -> Any:
+        """Call an endpoint and return its parsed response.
+
+        The last good response of every GET is kept. Endpoints with a cache
+        TTL are served from it until the TTL expires; after that the expired
+        copy is still returned while it is revalidated in the background,
+        with ETag/Last-Modified when the server provided them. Writes drop
+        the cached GET of the same URL.
+
+        Concurrent GETs of the same URL, e.g. from two coordinators or a
+        coordinator and the options flow, share one request and its result.
+
+        When a request fails the last good response is returned and marked
+        stale; the endpoint fallback (None for writes) is only used when
+        there is none yet. Auth errors (401/403), and other HTTP errors
+        than 400/404 that persist after the retries when there is no last
+        good response, are raised to the caller.
+        """
+        url = endpoint.url(system_sn)
+        if endpoint.method != "GET":
+            return await self._async_call(endpoint, system_sn, url, payload, None)
+
+        cached = self._cache.get(url)
+        if cached is not None and endpoint.cache_ttl is not None and not cached.stale:
+            if time.monotonic() - cached.fetched_at >= endpoint.cache_ttl.total_seconds():
+                self._async_schedule_revalidation(endpoint, url, cached)
+            self.metrics.record_cache_hit(endpoint.metrics_key, url)
+            return cached.data
+
+        slot = (endpoint.method, url)
+        if (in_flight := self._in_flight.get(slot)) is not None:
+            self.metrics.record_coalesced(endpoint.metrics_key, url)
+        else:
+            in_flight = self._in_flight[slot] = asyncio.ensure_future(
+                self._async_call(endpoint, system_sn, url, None, cached)
+            )
+            in_flight.add_done_callback(partial(self._async_request_done, slot))
+        # A cancelled caller leaves the request running for the others
+        return await asyncio.shield(in_flight)
 
+    @callback
+    def _async_request_done(self, slot: tuple[str, str], future: asyncio.Future) -> None:
+        if self._in_flight.get(slot) is future:
+            del self._in_flight[slot]
+        # Retrieved here too, in case every caller was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    async def _async_call(
+        self,
+        endpoint: Endpoint,
+        system_sn: str | None,
+        url: str,
+        payload: dict | None,
+        cached: _CachedResponse | None,
+    ) -> Any:
+        """Send a request and handle its failure as `_async_request` describes."""
         try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received power meter data: %s", data)
-                return data
+            return await self._async_send_with_retries(endpoint, url, payload, cached)
         except ClientResponseError as err:
             if err.status in (404, 400):
-                _LOGGER.warning(f"Power data for system {system_sn} not found,(HTTP {err.status}), returning dummy data")
-                return POWER_METER
+                _LOGGER.warning("%s %s for system %s not found (HTTP %s)", endpoint.method, endpoint.name, system_sn, err.status)
+                return self._fallback(endpoint, url, cached)
+            if cached is not None and err.status not in (401, 403):
+                _LOGGER.warning("%s %s failed for system %s (HTTP %s), serving the last good data", endpoint.method, endpoint.name, system_sn, err.status)
+                return self._fallback(endpoint, url, cached)
+            if cached is not None:
+                cached.stale = True
             raise
         except Exception as err:
-            _LOGGER.error("Failed to fetch system power data: %s", err)
-            return POWER_METER
+            _LOGGER.error("%s %s failed for system %s: %s", endpoint.method, endpoint.name, system_sn, err)
+            return self._fallback(endpoint, url, cached)
+        finally:
+            if endpoint.method != "GET":
+                self.invalidate_cache(endpoint, system_sn)
 
-    async def async_get_system_energy(self, system_sn: str) -> dict:
-        """Fetch system energy data from the energy meter endpoint."""
-        token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/energy_meter"
+    @callback
+    def _async_schedule_revalidation(self, endpoint: Endpoint, url: str, cached: _CachedResponse) -> None:
+        """Refresh an expired cached response without making the caller wait."""
+        if url in self._revalidating:
+            return
+        self._revalidating.add(url)
+        self._oauth_session.hass.async_create_background_task(
+            self._async_revalidate(endpoint, url, cached),
+            f"{DOMAIN} revalidate {endpoint.name}",
+        )
 
+    async def _async_revalidate(self, endpoint: Endpoint, url: str, cached: _CachedResponse) -> None:
         try:
-            async with self._websession.get(url, headers=headers) as resp:
-                text = await resp.text()  # Read full response in case of error
-                if resp.status != 200:
-                    _LOGGER.error("Energy meter request failed: %s - %s", resp.status, text)
-                    resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received energy meter: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Energy data for system {system_sn} not found,(HTTP {err.status}), returning dummy data")
-                return ENERGY_METER
-            raise
+            await self._async_send_with_retries(endpoint, url, None, cached)
         except Exception as err:
-            _LOGGER.error("Failed to fetch system energy data: %s", err)
-            return ENERGY_METER
+            _LOGGER.debug("Background revalidation of %s failed: %s", url, err)
+            cached.stale = True
+        finally:
+            self._revalidating.discard(url)
 
+    async def _async_send_with_retries(
+        self,
+        endpoint: Endpoint,
+        url: str,
+        payload: dict | None,
+        cached: _CachedResponse | None,
+    ) -> Any:
+        """Send a request through the rate limiter, retrying transient failures.
 
-    async def get_battery_ups_state(self, system_sn: str) -> dict:
-        """Fetch the current UPS battery state (enabled/disabled)."""
-        token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/battery_ups"
+        HTTP 429/5xx, timeouts and connection errors are retried up to
+        `endpoint.retries` times with exponential backoff and full jitter; a
+        Retry-After header holds every request of the account meanwhile.
 
-        try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received battery ups data: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Battery UPS data for system {system_sn} not found, (HTTP {err.status}), returning dummy data")
-                return {"enable": False}
-            raise
-        except Exception as err:
-            _LOGGER.error("Failed to fetch battery UPS state: %s", err)
-            return {"enable": False}
+        A GET whose URL was invalidated by a write while it was in flight
+        may have read the data from before the write; it is not cached,
+        and the URL is read again.
+        """
+        priority = PRIORITY_READ if endpoint.method == "GET" else PRIORITY_WRITE
+        attempt = 0
+        while True:
+            await self._limiter.acquire(priority)
+            generation = self._cache_generation(url)
+            try:
+                with self.metrics.measure(endpoint.metrics_key, url) as record:
+                    data = await self._async_send(endpoint, url, payload, cached, record, generation)
+                if data is not _SUPERSEDED:
+                    return data
+                _LOGGER.debug("%s was written while it was read, reading it again", url)
+                cached = None
+                continue
+            except ClientResponseError as err:
+                if (err.status != 429 and err.status < 500) or attempt >= endpoint.retries:
+                    raise
+                if (retry_after := _parse_retry_after(err.headers)) is not None:
+                    self._limiter.defer(retry_after)
+            except (ClientError, asyncio.TimeoutError):
+                if attempt >= endpoint.retries:
+                    raise
 
+            backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt)
+            delay = random.uniform(0, backoff.total_seconds())
+            attempt += 1
+            _LOGGER.debug("Retrying %s %s in %.1fs (attempt %s)", endpoint.method, url, delay, attempt)
+            await asyncio.sleep(delay)
 
-    async def set_battery_ups_state(self, system_sn: str, enable: bool) -> None:
-        """Set the UPS battery enabled state."""
-        token = await self.async_get_access_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        payload = {"enable": enable}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/battery_ups"
+    async def _async_send(
+        self,
+        endpoint: Endpoint,
+        url: str,
+        payload: dict | None,
+        cached: _CachedResponse | None,
+        record: RequestRecord,
+        generation: tuple[int, int],
+    ) -> Any:
+        """Send a single request and return its parsed JSON body.
 
-        try:
-            async with self._websession.put(url, headers=headers, json=payload) as resp:
-                resp.raise_for_status()
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Cannot update battery UPS state for {system_sn}: not found")
-            else:
-                raise
-        except Exception as err:
-            _LOGGER.error("Failed to update battery UPS state: %s", err)
+        Returns _SUPERSEDED for a GET whose URL was invalidated since
+        `generation` was taken, without caching what it read.
+        """
+        headers = await self._async_get_headers()
+        if cached is not None and (cached.etag or cached.last_modified):
+            headers = dict(headers)
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self._websession.request(
+            endpoint.method,
+            url,
+            headers=headers,
+            json=payload,
+            timeout=ClientTimeout(total=endpoint.timeout),
+        ) as resp:
+            record.status = resp.status
+            if resp.status >= 400:
+                _LOGGER.debug("%s %s failed: %s - %s", endpoint.method, url, resp.status, await resp.text())
+            resp.raise_for_status()
+            if endpoint.method != "GET":
+                return True
+            if self._cache_generation(url) != generation:
+                return _SUPERSEDED
+            if resp.status == 304 and cached is not None:
+                cached.fetched_at = time.monotonic()
+                cached.received_at = time.time()
+                cached.stale = False
+                return cached.data
+            record.bytes = len(await resp.read())
+            data = await resp.json()
+            _LOGGER.debug("Received %s: %s", endpoint.name, data)
+            # Parsed once here, so the cache and every caller share the model
+            if endpoint.parse is not None:
+                data = endpoint.parse(data)
+            self._cache[url] = _CachedResponse(
+                data,
+                time.monotonic(),
+                time.time(),
+                resp.headers.get("ETag"),
+                resp.headers.get("Last-Modified"),
+            )
+            return data
+
+    def _cache_generation(self, url: str) -> tuple[int, int]:
+        """Return a value that changes whenever the cached response of `url` is invalidated."""
+        return self._cache_epoch, self._generations.get(url, 0)
+
+    def invalidate_cache(self, endpoint: Endpoint | None = None, system_sn: str | None = None) -> None:
+        """Drop the cached response for an endpoint, or the whole cache.
+
+        GETs in flight are left to finish, but later callers no longer join
+        them, and what they read is not cached, so they cannot get data
+        from before a write.
+        """
+        if endpoint is None:
+            self._cache_epoch += 1
+            self._cache.clear()
+            self._in_flight.clear()
+        else:
+            url = endpoint.url(system_sn)
+            self._generations[url] = self._generations.get(url, 0) + 1
+            self._cache.pop(url, None)
+            self._in_flight.pop(("GET", url), None)
+
+    def stale_since(self, endpoint_name: str, system_sn: str | None = None) -> datetime | None:
+        """Return when the data served for an endpoint was fetched, if it is stale."""
+        cached = self._cache.get(_GET_ENDPOINTS[endpoint_name].url(system_sn))
+        if cached is None or not cached.stale:
+            return None
+        return dt_util.utc_from_timestamp(cached.received_at)
+
+    def _fallback(self, endpoint: Endpoint, url: str, cached: _CachedResponse | None) -> Any:
+        """Return the last good payload, or the dummy payload on a cold start."""
+        self.metrics.record_fallback(endpoint.metrics_key, url, cached is not None)
+        if cached is not None:
+            cached.stale = True
+            return cached.data
+        return endpoint.fallback
 
-    async def async_get_charging_schedule(self, system_sn: str) -> dict:
+    async def async_get_systems(self) -> tuple[System, ...]:
+        """Fetch list of systems from the SunPower Maxeon API."""
+        return await self._async_request(SYSTEMS_ENDPOINT)
+
+    async def async_get_system_details(self, system_sn: str) -> System:
+        """Fetch system details for a specific system by serial number."""
+        return await self._async_request(DETAILS_ENDPOINT, system_sn)
+
+    async def async_get_system_power(self, system_sn: str) -> PowerMeter:
+        """Fetch system power data from the power meter endpoint."""
+        return await self._async_request(POWER_METER_ENDPOINT, system_sn)
+
+    async def async_get_system_energy(self, system_sn: str) -> EnergyMeter:
+        """Fetch system energy data from the energy meter endpoint."""
+        return await self._async_request(ENERGY_METER_ENDPOINT, system_sn)
+
+    async def get_battery_ups_state(self, system_sn: str) -> BatteryUps:
+        """Fetch the current UPS battery state (enabled/disabled)."""
+        return await self._async_request(BATTERY_UPS_ENDPOINT, system_sn)
+
+    async def set_battery_ups_state(self, system_sn: str, enable: bool) -> bool:
+        """Set the UPS battery enabled state."""
+        return bool(await self._async_request(SET_BATTERY_UPS_ENDPOINT, system_sn, {"enable": enable}))
+
+    async def async_get_charging_schedule(self, system_sn: str) -> ChargingSchedule:
         """Fetch the battery charging schedule for a specific system by serial number."""
-        token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/charging_schedule"
+        return await self._async_request(CHARGING_SCHEDULE_ENDPOINT, system_sn)
 
-        try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received charghing schedule: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Charging schedule for system {system_sn} not found, (HTTP {err.status}), returning dummy data")
-                return CHARGING_SCHEDULE
-            raise
-        except Exception as err:
-            _LOGGER.error("Failed to fetch charging schedule: %s", err)
-            return CHARGING_SCHEDULE
-    
-    async def async_set_charging_schedule(self, system_sn: str, schedule: dict) -> None:
+    async def async_set_charging_schedule(self, system_sn: str, schedule: dict) -> bool:
         """Set the battery charging schedule for a specific system by serial number."""
-        token = await self.async_get_access_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/charging_schedule"
+        return bool(await self._async_request(SET_CHARGING_SCHEDULE_ENDPOINT, system_sn, schedule))
 
-        try:
-            async with self._websession.put(url, headers=headers, json=schedule) as resp:
-                resp.raise_for_status()
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Cannot update charging schedule for system {system_sn}: not found(HTTP {err.status}), returning dummy data")
-            else:
-                raise
-        except Exception as err:
-            _LOGGER.error("Failed to update charging schedule: %s", err)
-
-    async def async_get_discharging_schedule(self, system_sn: str) -> dict:
+    async def async_get_discharging_schedule(self, system_sn: str) -> DischargingSchedule:
         """Fetch the battery discharging schedule for a specific system by serial number."""
-        token = await self.async_get_access_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/discharging_schedule"
+        return await self._async_request(DISCHARGING_SCHEDULE_ENDPOINT, system_sn)
 
-        try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received discharghing schedule: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Discharging schedule for system {system_sn} not found, (HTTP {err.status}), returning dummy data")
-                return DISCHARGING_SCHEDULE
-            raise
-        except Exception as err:
-            _LOGGER.error("Failed to fetch discharging schedule: %s", err)
-            return DISCHARGING_SCHEDULE
-    
-    async def async_get_export_limit(self, system_sn: str) -> dict:
+    async def async_set_discharging_schedule(self, system_sn: str, schedule: dict) -> bool:
+        """Set the battery discharging schedule for a specific system by serial number."""
+        return bool(await self._async_request(SET_DISCHARGING_SCHEDULE_ENDPOINT, system_sn, schedule))
+
+    async def async_get_export_limit(self, system_sn: str) -> ExportLimit:
         """Fetch the current export limit for the system."""
-        token = await self.async_get_access_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/export_limit"
-        try:
-            async with self._websession.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                _LOGGER.info("Received export limit: %s", data)
-                return data
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Export limit for system {system_sn} not found,(HTTP {err.status}), returning dummy data")
-                return EXPORT_LIMIT
-            raise
-        except Exception as err:
-            _LOGGER.error("Failed to fetch export limit: %s", err)
-            return EXPORT_LIMIT
-        
+        return await self._async_request(EXPORT_LIMIT_ENDPOINT, system_sn)
+
     async def async_set_export_limit(self, system_sn: str, export_rate: int) -> bool:
         """Set a new export limit (in %) for the system."""
-        token = await self.async_get_access_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        url = f"https://api.sunpower.maxeon.com/v1/systems/{system_sn}/export_limit"
-        payload = {"export_rate": export_rate}
-        try:
-            async with self._websession.put(url, headers=headers, json=payload) as resp:
-                resp.raise_for_status()
-                return True
-        except ClientResponseError as err:
-            if err.status in (404, 400):
-                _LOGGER.warning(f"Cannot update export limit for system {system_sn}: not found")
-            else:
-                raise
-        except Exception as err:
-            _LOGGER.error("Failed to update export limit: %s", err)
\ No newline at end of file
+        return bool(await self._async_request(SET_EXPORT_LIMIT_ENDPOINT, system_sn, {"export_rate": export_rate}))
@@ -0,0 +1,283 @@
+"""Benchmark the coordinator and API layers against the local simulator.
+
+Runs offline: every request goes to simulator.MaxeonSimulator on
+localhost. For each system count it measures the latency, CPU time,
+requests, entity listener notifications and entity state writes of
+full, realtime and periodic cycles, and the peak memory of setting up
+and refreshing all systems once. It then lets the coordinators run on their own schedules
+for --duration seconds, against a simulator running --speed times faster
+than the wall clock, and counts the requests each system costs per hour.
+Results are printed, or written with --output, as JSON so runs can be
+compared.
+
+Requires Home Assistant to be installed:
+
+    python benchmarks/bench_coordinators.py --systems 1 10 100 --duration 300 --output results.json
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from functools import partial
+import importlib
+import importlib.util
+import json
+from pathlib import Path
+import platform
+from statistics import mean, quantiles
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from aiohttp import ClientSession
+from homeassistant.core import HomeAssistant
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "sunpower_maxeon"
+KINDS = ("full", "realtime", "periodic")
+
+
+def _load_integration() -> dict[str, Any]:
+    """Import the integration from the repository root as `sunpower_maxeon`."""
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
+    return {
+        name: importlib.import_module(f"{PACKAGE}.{name}")
+        for name in ("api", "const", "coordinator", "models", "rate_limiter", "samples", "sensor", "simulator", "store")
+    }
+
+
+class _StaticOAuthSession:
+    """OAuth2Session stand-in holding a token that outlives the benchmark."""
+
+    valid_token = True
+
+    def __init__(self, hass: HomeAssistant, token: dict) -> None:
+        self.hass = hass
+        self.token = {**token, "expires_at": time.time() + token["expires_in"]}
+
+
+class _Setup:
+    """The objects async_setup_entry would create for N systems."""
+
+    def __init__(self, hass: HomeAssistant, modules: dict, websession: ClientSession, simulator, system_sns: list[str], rate: float) -> None:
+        const = modules["const"]
+        coordinator = modules["coordinator"]
+        limiter = modules["rate_limiter"].RateLimiter(rate, max(int(rate), 1))
+        self.api = modules["api"].AsyncConfigEntryAuth(
+            websession, _StaticOAuthSession(hass, simulator.issue_token(lifetime=86400)), limiter
+        )
+        semaphore = asyncio.Semaphore(const.DEFAULT_MAX_CONCURRENT_REQUESTS)
+        registry = coordinator.FreshnessRegistry()
+        capacity = int(const.DEFAULT_SAMPLE_HISTORY_HOURS * 3600 / const.REALTIME_UPDATE_INTERVAL.total_seconds())
+        stagger = min(const.SYSTEM_POLL_STAGGER, const.REALTIME_UPDATE_INTERVAL / len(system_sns))
+
+        self.systems = []
+        for index, system_sn in enumerate(system_sns):
+            store = modules["store"].SystemStore({**modules["models"].SYSTEM_DATA_DEFAULTS, "system_sn": system_sn})
+            samples = modules["samples"].PowerSampleBuffer(capacity)
+            self.systems.append({
+                "full": coordinator.SunPowerFullCoordinator(hass, self.api, store, semaphore, registry),
+                "realtime": coordinator.SunPowerRealtimeCoordinator(
+                    hass, self.api, store, semaphore, registry, samples, poll_offset=index * stagger
+                ),
+                "periodic": coordinator.SunPowerPeriodicCoordinator(hass, self.api, store, semaphore, registry),
+            })
+
+        # The real entities, listening with their data key as context as
+        # async_added_to_hass would register them. Notifications count the
+        # coordinator callbacks; state writes count the ones the entity's
+        # change-only check let through to async_write_ha_state.
+        self.listener_notifications = 0
+        self.state_writes = 0
+        sensor = modules["sensor"]
+        entity_classes = (
+            (sensor.SunPowerSensor, sensor.SENSORS),
+            (sensor.SunPowerBinarySensor, sensor.BINARY_SENSORS),
+        )
+        for system in self.systems:
+            device_info = {"identifiers": {(const.DOMAIN, system["full"].store["system_sn"])}}
+            for entity_class, descriptions in entity_classes:
+                for description in descriptions:
+                    entity = entity_class(system[description.coordinator], description, device_info)
+                    entity.hass = hass
+                    entity.async_write_ha_state = self._written
+                    system[description.coordinator].async_add_listener(
+                        partial(self._notified, entity), description.data_key
+                    )
+
+    def _notified(self, entity) -> None:
+        self.listener_notifications += 1
+        entity._handle_coordinator_update()
+
+    def _written(self) -> None:
+        self.state_writes += 1
+
+    async def async_refresh(self, kind: str) -> None:
+        """Refresh one kind of coordinator of every system at once."""
+        coordinators = [system[kind] for system in self.systems]
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+        # The benchmark drives the cycles; keep the scheduled refreshes out
+        for coordinator in coordinators:
+            coordinator._unschedule_refresh()
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        return {"mean": values[0], "p50": values[0], "p95": values[0], "max": values[0]}
+    percentiles = quantiles(values, n=20, method="inclusive")
+    return {"mean": mean(values), "p50": percentiles[9], "p95": percentiles[18], "max": max(values)}
+
+
+async def _endpoint_coverage(hass: HomeAssistant, modules: dict, websession: ClientSession, simulator, rate: float) -> dict[str, set[str]]:
+    """Return the endpoints each kind of coordinator polls on its own."""
+    coverage = {}
+    for kind in KINDS:
+        setup = _Setup(hass, modules, websession, simulator, simulator.system_sns[:1], rate)
+        before = Counter(simulator.requests)
+        await setup.async_refresh(kind)
+        coverage[kind] = {route.split(" ", 1)[1] for route in simulator.requests - before}
+    return coverage
+
+
+async def _requests_per_hour(hass: HomeAssistant, modules: dict, websession: ClientSession, simulator, rate: float, duration: float) -> dict[str, float]:
+    """Count the requests per hour of one system with the coordinators on their own schedules.
+
+    The first refresh of every coordinator is left out, so the count
+    covers the steady state: adaptive and night intervals, cache hits
+    and skips of data another coordinator just fetched.
+    """
+    setup = _Setup(hass, modules, websession, simulator, simulator.system_sns, rate)
+    coordinators = [system[kind] for system in setup.systems for kind in KINDS]
+    # With listeners attached, each refresh schedules the next one
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+    before = Counter(simulator.requests)
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+
+    sent = simulator.requests - before
+    scale = 3600 / duration / len(setup.systems)
+    return {route: count * scale for route, count in sorted(sent.items())} | {"total": sum(sent.values()) * scale}
+
+
+async def _run_systems(hass: HomeAssistant, modules: dict, count: int, args: argparse.Namespace) -> dict[str, Any]:
+    simulator = modules["simulator"].MaxeonSimulator(
+        count, speed=args.speed, seed=count, sample_interval=args.sample_interval
+    )
+    modules["api"].API_BASE_URL = await simulator.start()
+    try:
+        async with ClientSession() as websession:
+            coverage = await _endpoint_coverage(hass, modules, websession, simulator, args.rate)
+
+            tracemalloc.start()
+            setup = _Setup(hass, modules, websession, simulator, simulator.system_sns, args.rate)
+            for kind in KINDS:
+                await setup.async_refresh(kind)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results = {}
+            for kind in KINDS:
+                latencies, cpu_times, requests, notifications, writes = [], [], [], [], []
+                for _ in range(args.cycles):
+                    sent = sum(simulator.requests.values())
+                    notified = setup.listener_notifications
+                    written = setup.state_writes
+                    started, cpu_started = time.perf_counter(), time.process_time()
+                    await setup.async_refresh(kind)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    cpu_times.append((time.process_time() - cpu_started) * 1000)
+                    requests.append(sum(simulator.requests.values()) - sent)
+                    notifications.append(setup.listener_notifications - notified)
+                    writes.append(setup.state_writes - written)
+                results[kind] = {
+                    "latency_ms": _summary(latencies),
+                    "cpu_ms": _summary(cpu_times),
+                    "requests_per_cycle": mean(requests),
+                    "listener_notifications_per_cycle": mean(notifications),
+                    "state_writes_per_cycle": mean(writes),
+                }
+
+            requests_per_hour = await _requests_per_hour(
+                hass, modules, websession, simulator, args.rate, args.duration
+            )
+    finally:
+        await simulator.stop()
+
+    return {
+        "systems": count,
+        "peak_memory_bytes": peak_memory,
+        "requests_per_hour_per_system": requests_per_hour,
+        "endpoints_polled": {kind: sorted(names) for kind, names in coverage.items()},
+        "cycles": results,
+    }
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    modules = _load_integration()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            results = [
+                await _run_systems(hass, modules, count, args)
+                for count in args.systems
+            ]
+        finally:
+            await hass.async_stop(force=True)
+
+    manifest = json.loads((ROOT / "manifest.json").read_text())
+    return {
+        "integration_version": manifest["version"],
+        "python": platform.python_version(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "parameters": {
+            "systems": args.systems,
+            "cycles": args.cycles,
+            "rate": args.rate,
+            "duration": args.duration,
+            "speed": args.speed,
+            "sample_interval": args.sample_interval,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--systems", type=int, nargs="+", default=[1, 10, 100], help="system counts to benchmark")
+    parser.add_argument("--cycles", type=int, default=20, help="measured cycles per coordinator kind")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1000.0,
+        help="client rate limit in requests/s; high by default so it does not dominate latency",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=120.0,
+        help="seconds the coordinators run on their own schedules to count the requests per hour",
+    )
+    parser.add_argument("--speed", type=float, default=60.0, help="simulated time per wall-clock second")
+    parser.add_argument("--sample-interval", type=int, default=30, help="seconds between two samples of the simulated meters")
+    parser.add_argument("--output", type=Path, help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(_main(args)), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """Config flow for SunPower Maxeon."""
-from collections.abc import Mapping
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import replace
 from typing import Any
 import logging
 import voluptuous as vol
@@ -15,13 +16,28 @@ from homeassistant.helpers.selector import (
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
 )
 
-from .const import DOMAIN
+from .const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SAMPLE_HISTORY_HOURS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SAMPLE_HISTORY_HOURS,
+    DOMAIN,
+)
 from .api import AsyncConfigEntryAuth
+from .models import SYSTEM_DATA_DEFAULTS, BatteryUps, ChargingSchedule, DischargingSchedule
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def _default(value: Any, default: Any) -> Any:
+    """Return a form default, using `default` for fields the API left out."""
+    return default if value is None else value
+
+
 class OAuth2FlowHandler(
     config_entry_oauth2_flow.AbstractOAuth2FlowHandler, domain=DOMAIN
 ):
@@ -78,13 +94,35 @@ class OAuth2FlowHandler(
         return OptionsFlowHandler(config_entry)
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
-    """Handle options flow for SunPower Maxeon."""
+    """Handle options flow for SunPower Maxeon.
+
+    While the entry is loaded the flow works on the running integration:
+    forms show the current settings from the systems' stores, and saved
+    settings are written through to the store instead of being polled
+    back. The entry options are kept as they are, so saving does not
+    reload the entry; only the integration settings step changes them.
+    """
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         super().__init__()
         self._entry = config_entry
+        self._system_sns: list[str] = []
+        self._system_sn: str | None = None
+
+    def _entry_data(self) -> dict | None:
+        return self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+
+    def _system(self) -> dict | None:
+        """Return the running coordinators and store of the selected system, if any."""
+        if (data := self._entry_data()) is None:
+            return None
+        return data["systems"].get(self._system_sn)
 
     async def _get_api(self) -> AsyncConfigEntryAuth:
+        # Share the running client so writes invalidate its response cache
+        if (data := self._entry_data()) is not None:
+            return data["api"]
+
         websession = async_get_clientsession(self.hass)
         implementation = await config_entry_oauth2_flow.async_get_config_entry_implementation(
             self.hass, self._entry
@@ -94,126 +132,204 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         )
         return AsyncConfigEntryAuth(websession, oauth_session)
 
-    async def _get_system_sn(self, api: AsyncConfigEntryAuth) -> str:
-        systems = await api.async_get_systems()
-        if not systems.get("systems"):
+    async def _get_system_sn(self) -> str:
+        if self._system_sn:
+            return self._system_sn
+
+        if (data := self._entry_data()) is not None:
+            self._system_sns = list(data["systems"])
+        else:
+            systems = await (await self._get_api()).async_get_systems()
+            self._system_sns = [system.system_sn for system in systems]
+        if not self._system_sns:
             raise ValueError("No systems returned from API")
 
-        system_sn = systems["systems"][0].get("system_sn")
-        if not system_sn:
-            raise ValueError("System SN missing in API response")
+        self._system_sn = self._system_sns[0]
+        return self._system_sn
+
+    async def _async_get_current(
+        self, key: str, fetch: Callable[[AsyncConfigEntryAuth, str], Awaitable[Any]]
+    ) -> Any:
+        """Return a setting from the store, fetching it only if the store has none yet."""
+        system_sn = await self._get_system_sn()
+        if (system := self._system()) is not None and (value := system["store"][key]) != SYSTEM_DATA_DEFAULTS[key]:
+            return value
+        return await fetch(await self._get_api(), system_sn)
 
-        return system_sn
+    def _async_saved(self, title: str, changes: dict[str, Any]) -> FlowResult:
+        """Publish written settings in the running store and finish the flow."""
+        if (system := self._system()) is not None:
+            system["periodic"].async_apply(changes)
+        return self.async_create_entry(title=title, data=dict(self._entry.options))
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
-        """Show the menu with configuration sections."""
+        """Pick the system to configure when the account has several, then show the menu."""
+        await self._get_system_sn()
+        if len(self._system_sns) > 1:
+            return await self.async_step_system()
         return await self.async_step_menu()
 
+    async def async_step_system(self, user_input: dict[str, Any] | None = None):
+        """Choose which system the following steps apply to."""
+        if user_input is not None:
+            self._system_sn = user_input["system_sn"]
+            return await self.async_step_menu()
+
+        return self.async_show_form(
+            step_id="system",
+            data_schema=vol.Schema({
+                vol.Required("system_sn", default=self._system_sn): SelectSelector(
+                    SelectSelectorConfig(options=self._system_sns)
+                ),
+            }),
+        )
+
     async def async_step_menu(self, user_input: dict[str, Any] | None = None):
         """Menu step to choose what to configure."""
         return self.async_show_menu(
             step_id="menu",
-            menu_options={"charging", "discharging", "export", "ups"},
+            menu_options={"charging", "discharging", "export", "ups", "settings"},
         )
 
     async def async_step_charging(self, user_input: dict[str, Any] | None = None):
         """Configure charging schedule."""
-        api = await self._get_api()
-        system_sn = await self._get_system_sn(api)
-        charging = await api.async_get_charging_schedule(system_sn)
+        charging = await self._async_get_current("charging_schedule", AsyncConfigEntryAuth.async_get_charging_schedule)
+        errors: dict[str, str] = {}
 
         if user_input is not None:
-            await api.async_set_charging_schedule(system_sn, {
+            schedule = {
                 "enable": user_input["enable"],
                 "start_time_1": user_input["start_time_1"],
                 "end_time_1": user_input["end_time_1"],
                 "start_time_2": user_input["start_time_2"],
                 "end_time_2": user_input["end_time_2"],
                 "max_soc": user_input["max_soc"],
-            })
-            return self.async_create_entry(title="Charging Schedule", data={})
+            }
+            api = await self._get_api()
+            if await api.async_set_charging_schedule(self._system_sn, schedule):
+                return self._async_saved("Charging Schedule", {"charging_schedule": ChargingSchedule.from_dict(schedule)})
+            errors["base"] = "write_failed"
 
         return self.async_show_form(
             step_id="charging",
             data_schema=vol.Schema({
-                vol.Required("enable", default=charging.get("enable", True)): BooleanSelector(),
-                vol.Required("start_time_1", default=charging.get("start_time_1", "14:00")): TimeSelector(),
-                vol.Required("end_time_1", default=charging.get("end_time_1", "16:00")): TimeSelector(),
-                vol.Required("start_time_2", default=charging.get("start_time_2", "20:00")): TimeSelector(),
-                vol.Required("end_time_2", default=charging.get("end_time_2", "22:00")): TimeSelector(),
-                vol.Required("max_soc", default=charging.get("max_soc", 95)): NumberSelector(
+                vol.Required("enable", default=_default(charging.enable, True)): BooleanSelector(),
+                vol.Required("start_time_1", default=_default(charging.start_time_1, "14:00")): TimeSelector(),
+                vol.Required("end_time_1", default=_default(charging.end_time_1, "16:00")): TimeSelector(),
+                vol.Required("start_time_2", default=_default(charging.start_time_2, "20:00")): TimeSelector(),
+                vol.Required("end_time_2", default=_default(charging.end_time_2, "22:00")): TimeSelector(),
+                vol.Required("max_soc", default=_default(charging.max_soc, 95)): NumberSelector(
                     NumberSelectorConfig(min=0, max=100, step=1, mode="box", unit_of_measurement="%")
                 ),
             }),
+            errors=errors,
         )
 
     async def async_step_discharging(self, user_input: dict[str, Any] | None = None):
         """Configure discharging schedule."""
-        api = await self._get_api()
-        system_sn = await self._get_system_sn(api)
-        discharging = await api.async_get_discharging_schedule(system_sn)
+        discharging = await self._async_get_current(
+            "discharging_schedule", AsyncConfigEntryAuth.async_get_discharging_schedule
+        )
+        errors: dict[str, str] = {}
 
         if user_input is not None:
-            await api.async_set_discharging_schedule(system_sn, {
+            schedule = {
                 "enable": user_input["enable"],
                 "start_time_1": user_input["start_time_1"],
                 "end_time_1": user_input["end_time_1"],
                 "start_time_2": user_input["start_time_2"],
                 "end_time_2": user_input["end_time_2"],
                 "min_soc": user_input["min_soc"],
-            })
-            return self.async_create_entry(title="Discharging Schedule", data={})
+            }
+            api = await self._get_api()
+            if await api.async_set_discharging_schedule(self._system_sn, schedule):
+                return self._async_saved(
+                    "Discharging Schedule", {"discharging_schedule": DischargingSchedule.from_dict(schedule)}
+                )
+            errors["base"] = "write_failed"
 
         return self.async_show_form(
             step_id="discharging",
             data_schema=vol.Schema({
-                vol.Required("enable", default=discharging.get("enable", True)): BooleanSelector(),
-                vol.Required("start_time_1", default=discharging.get("start_time_1", "14:00")): TimeSelector(),
-                vol.Required("end_time_1", default=discharging.get("end_time_1", "16:00")): TimeSelector(),
-                vol.Required("start_time_2", default=discharging.get("start_time_2", "20:00")): TimeSelector(),
-                vol.Required("end_time_2", default=discharging.get("end_time_2", "22:00")): TimeSelector(),
-                vol.Required("min_soc", default=discharging.get("min_soc", 20)): NumberSelector(
+                vol.Required("enable", default=_default(discharging.enable, True)): BooleanSelector(),
+                vol.Required("start_time_1", default=_default(discharging.start_time_1, "14:00")): TimeSelector(),
+                vol.Required("end_time_1", default=_default(discharging.end_time_1, "16:00")): TimeSelector(),
+                vol.Required("start_time_2", default=_default(discharging.start_time_2, "20:00")): TimeSelector(),
+                vol.Required("end_time_2", default=_default(discharging.end_time_2, "22:00")): TimeSelector(),
+                vol.Required("min_soc", default=_default(discharging.min_soc, 20)): NumberSelector(
                     NumberSelectorConfig(min=0, max=100, step=1, mode="box", unit_of_measurement="%")
                 ),
             }),
+            errors=errors,
         )
 
     async def async_step_export(self, user_input: dict[str, Any] | None = None):
         """Configure export limit."""
-        api = await self._get_api()
-        system_sn = await self._get_system_sn(api)
-        export = await api.async_get_export_limit(system_sn)
+        export = await self._async_get_current("export_limit", AsyncConfigEntryAuth.async_get_export_limit)
+        errors: dict[str, str] = {}
 
         if user_input is not None:
-            await api.async_set_export_limit(system_sn, {
-                "export_rate": user_input["export_rate"]
-            })
-            return self.async_create_entry(title="Export Limit", data={})
+            export_rate = int(user_input["export_rate"])
+            api = await self._get_api()
+            if await api.async_set_export_limit(self._system_sn, export_rate):
+                return self._async_saved("Export Limit", {"export_limit": replace(export, export_rate=export_rate)})
+            errors["base"] = "write_failed"
 
         return self.async_show_form(
             step_id="export",
             data_schema=vol.Schema({
-                vol.Required("export_rate", default=export.get("export_rate", 80)): NumberSelector(
+                vol.Required("export_rate", default=_default(export.export_rate, 80)): NumberSelector(
                     NumberSelectorConfig(min=0, max=100, step=1, mode="box", unit_of_measurement="%")
                 ),
             }),
+            errors=errors,
         )
 
     async def async_step_ups(self, user_input: dict[str, Any] | None = None):
         """Configure UPS state."""
-        api = await self._get_api()
-        system_sn = await self._get_system_sn(api)
-        ups = await api.get_battery_ups_state(system_sn)
+        ups = await self._async_get_current("battery_ups", AsyncConfigEntryAuth.get_battery_ups_state)
+        errors: dict[str, str] = {}
 
         if user_input is not None:
-            await api.set_battery_ups_state(system_sn, {
-                "enable": user_input["enable"]
-            })
-            return self.async_create_entry(title="UPS State", data={})
+            api = await self._get_api()
+            if await api.set_battery_ups_state(self._system_sn, user_input["enable"]):
+                return self._async_saved("UPS State", {"battery_ups": BatteryUps(enable=user_input["enable"])})
+            errors["base"] = "write_failed"
 
         return self.async_show_form(
             step_id="ups",
             data_schema=vol.Schema({
-                vol.Required("enable", default=ups.get("enable", True)): BooleanSelector()
+                vol.Required("enable", default=_default(ups.enable, True)): BooleanSelector()
+            }),
+            errors=errors,
+        )
+
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None):
+        """Configure how the integration polls the API; saving reloads the entry."""
+        options = self._entry.options
+
+        if user_input is not None:
+            return self.async_create_entry(
+                title="Integration Settings",
+                data={
+                    **options,
+                    CONF_MAX_CONCURRENT_REQUESTS: int(user_input[CONF_MAX_CONCURRENT_REQUESTS]),
+                    CONF_SAMPLE_HISTORY_HOURS: int(user_input[CONF_SAMPLE_HISTORY_HOURS]),
+                },
+            )
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+                ): NumberSelector(NumberSelectorConfig(min=1, max=16, step=1, mode="box")),
+                vol.Required(
+                    CONF_SAMPLE_HISTORY_HOURS,
+                    default=options.get(CONF_SAMPLE_HISTORY_HOURS, DEFAULT_SAMPLE_HISTORY_HOURS),
+                ): NumberSelector(
+                    NumberSelectorConfig(min=1, max=168, step=1, mode="box", unit_of_measurement="h")
+                ),
             }),
-        )
\ No newline at end of file
+        )
@@ -1,9 +1,79 @@
 """Constants for the SunPower Maxeon integration."""
+from datetime import timedelta
+import os
 from typing import Optional, Final
 DOMAIN = "sunpower_maxeon"
 
-OAUTH2_AUTHORIZE = "https://api.sunpower.maxeon.com/v1/authorize"
-OAUTH2_TOKEN = "https://api.sunpower.maxeon.com/v1/token"
+# Both can be pointed at another server, e.g. the local simulator, by
+# setting the variables in the environment Home Assistant starts in
+API_BASE_URL = os.environ.get("SUNPOWER_MAXEON_API_URL", "https://api.sunpower.maxeon.com/v1").rstrip("/")
+OAUTH2_BASE_URL = os.environ.get("SUNPOWER_MAXEON_OAUTH2_URL", API_BASE_URL).rstrip("/")
+OAUTH2_AUTHORIZE = f"{OAUTH2_BASE_URL}/authorize"
+OAUTH2_TOKEN = f"{OAUTH2_BASE_URL}/token"
+
+# Seconds before an API request is abandoned
+DEFAULT_REQUEST_TIMEOUT = 30
+
+# Client-side rate limit shared by all requests of an account
+REQUEST_RATE = 5.0  # requests per second
+REQUEST_BURST = 10
+
+# Retries for HTTP 429/5xx and transport errors, with jittered exponential backoff
+DEFAULT_REQUEST_RETRIES = 2
+RETRY_BACKOFF_BASE = timedelta(seconds=1)
+RETRY_BACKOFF_MAX = timedelta(seconds=30)
+
+# How long GET responses are reused before being revalidated
+SYSTEMS_CACHE_TTL = timedelta(minutes=30)
+SETTINGS_CACHE_TTL = timedelta(minutes=30)
+
+# How long setup waits for the system list when there is no saved
+# snapshot to start from
+SETUP_SYSTEMS_TIMEOUT = 10  # seconds
+
+# Snapshot of the latest data kept on disk for warm starts
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 300  # seconds
+
+# Renew the access token this long before it expires
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+# Wait this long before retrying a failed background token refresh
+TOKEN_REFRESH_RETRY = timedelta(minutes=1)
+
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# Hours of realtime power samples kept in memory per system, sized for
+# one sample per REALTIME_UPDATE_INTERVAL
+CONF_SAMPLE_HISTORY_HOURS = "sample_history_hours"
+DEFAULT_SAMPLE_HISTORY_HOURS = 24
+
+REALTIME_UPDATE_INTERVAL = timedelta(seconds=10)
+PERIODIC_UPDATE_INTERVAL = timedelta(minutes=10)
+FULL_UPDATE_INTERVAL = timedelta(minutes=60)
+
+# Adaptive realtime polling: bounds for the learned interval, how long after
+# an expected power_meter sample to poll, and how many samples to learn from
+REALTIME_MIN_INTERVAL = timedelta(seconds=5)
+REALTIME_MAX_INTERVAL = timedelta(minutes=1)
+REALTIME_NIGHT_INTERVAL = timedelta(minutes=5)
+REALTIME_POLL_DELAY = timedelta(seconds=1)
+REALTIME_CADENCE_WINDOW = 8
+# Battery power (W) below which the battery counts as idle
+BATTERY_IDLE_POWER = 10
+
+# Latencies kept per endpoint for the API metrics percentiles
+METRICS_LATENCY_WINDOW = 256
+# API requests kept in the trace included in diagnostics
+REQUEST_TRACE_SIZE = 200
+# Refresh cycles kept per coordinator for diagnostics
+COORDINATOR_CYCLE_HISTORY = 20
+
+# Upper bound on the delay between two systems' first refreshes
+SYSTEM_POLL_STAGGER = timedelta(seconds=2)
+
+# Unique ID prefixes used before entities were keyed by system serial
+LEGACY_UNIQUE_ID_PREFIXES = ("sm_energy_", "sm_power_", "sms_", "sunpower_")
 
 SYSTEMS = {
     "systems": [
@@ -93,17 +163,17 @@ EXPORT_LIMIT = {
   "export_rate": 80
 }
 
-shared_data = {
-    "system_sn": None,
-    "system": {},
-    "details": {},
-    "power": {},
-    "energy": {},
-    "battery_ups": {},
-    "charging_schedule": {},
-    "discharging_schedule": {},
-    "export_limit": {},
-}
+# Fields of the systems response exposed as system info sensor attributes
+SYSTEM_INFO_ATTRIBUTES: Final[tuple[str, ...]] = (
+    "system_sn",
+    "active_at",
+    "inverter_model",
+    "battery_model",
+    "meter_type",
+    "inv_version",
+    "ems_version",
+    "bms_version",
+)
 
 ENERGY_SENSOR_KEYS: Final[list[str]] = [
     "e_pv_generation",
@@ -112,4 +182,22 @@ ENERGY_SENSOR_KEYS: Final[list[str]] = [
     "e_grid_import",
     "e_grid_export",
     "e_consumption",
-]
\ No newline at end of file
+]
+
+# Realtime power field, and its sign, integrated into each energy counter
+# between energy_meter polls. p_grid is positive when importing and
+# p_storage is positive when discharging.
+ENERGY_POWER_SOURCES: Final[dict[str, tuple[str, int]]] = {
+    "e_pv_generation": ("p_pv", 1),
+    "e_storage_charge": ("p_storage", -1),
+    "e_storage_discharge": ("p_storage", 1),
+    "e_grid_import": ("p_grid", 1),
+    "e_grid_export": ("p_grid", -1),
+    "e_consumption": ("p_consumption", 1),
+}
+
+# Power samples further apart than this are not integrated across
+ENERGY_INTERPOLATION_MAX_GAP = timedelta(minutes=15)
+
+# Minute past each hour at which the previous hour's statistics are pushed
+STATISTICS_COMPILE_MINUTE = 5
@@ -1,79 +1,406 @@
 """Coordinator for SunPower Maxeon integration."""
 
+import asyncio
 import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping
 from datetime import timedelta
+from functools import partial
+from statistics import median
+from typing import Any
 
+from homeassistant.core import callback
+from homeassistant.helpers.sun import is_up
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from .api import AsyncConfigEntryAuth
-from .const import SYSTEM_DETAILS, POWER_METER, ENERGY_METER, shared_data  # Ensure ENERGY_METER is defined
+from .models import PowerMeter
+from .samples import EnergyInterpolator, PowerSampleBuffer
+from .store import SystemStore
+from .const import (
+    BATTERY_IDLE_POWER,
+    COORDINATOR_CYCLE_HISTORY,
+    FULL_UPDATE_INTERVAL,
+    PERIODIC_UPDATE_INTERVAL,
+    REALTIME_CADENCE_WINDOW,
+    REALTIME_MAX_INTERVAL,
+    REALTIME_MIN_INTERVAL,
+    REALTIME_NIGHT_INTERVAL,
+    REALTIME_POLL_DELAY,
+    REALTIME_UPDATE_INTERVAL,
+    SYSTEM_DETAILS,
+    POWER_METER,
+    ENERGY_METER,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-class SunPowerFullCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, api, shared_data):
+
+# Returned by FreshnessRegistry.async_fetch when the data is already fresh
+SKIPPED = object()
+
+# Endpoint behind each coordinator data key, whose staleness entities show
+ENDPOINT_NAMES = {
+    "system": "systems",
+    "details": "details",
+    "power": "power_meter",
+    "energy_estimate": "power_meter",
+    "energy": "energy_meter",
+    "battery_ups": "battery_ups",
+    "charging_schedule": "charging_schedule",
+    "discharging_schedule": "discharging_schedule",
+    "export_limit": "export_limit",
+}
+
+
+class FreshnessRegistry:
+    """Track when each endpoint was last fetched, per system and by which coordinator.
+
+    Coordinators sharing a registry skip an endpoint that another one
+    fetched within their own update interval, and share a fetch that
+    another one has in flight instead of starting their own.
+    """
+
+    def __init__(self) -> None:
+        self._fetched: dict[tuple[str, str], tuple[float, str]] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+    def is_fresh(self, system_sn: str, key: str, fetcher: str, max_age: timedelta) -> bool:
+        """Return True if another coordinator fetched `key` less than `max_age` ago."""
+        fetched = self._fetched.get((system_sn, key))
+        return (
+            fetched is not None
+            and fetched[1] != fetcher
+            and time.monotonic() - fetched[0] < max_age.total_seconds()
+        )
+
+    async def async_fetch(
+        self,
+        system_sn: str,
+        key: str,
+        fetcher: str,
+        max_age: timedelta,
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the result of `call`, or SKIPPED if another coordinator has fresh data."""
+        slot = (system_sn, key)
+        if (inflight := self._inflight.get(slot)) is not None:
+            return await asyncio.shield(inflight)
+        if self.is_fresh(system_sn, key, fetcher, max_age):
+            return SKIPPED
+
+        task = asyncio.ensure_future(call())
+        self._inflight[slot] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            del self._inflight[slot]
+        self._fetched[slot] = (time.monotonic(), fetcher)
+        return result
+
+
+class SunPowerCoordinator(DataUpdateCoordinator):
+    """Base for the coordinators polling one system.
+
+    All coordinators of an entry share the account-wide semaphore capping
+    concurrent requests, and the freshness registry.
+
+    Entities listen with the data key they show as context, and are only
+    notified when the data or staleness under that key changed.
+
+    The start, duration and success of the last refresh cycles are kept in
+    `cycles` for diagnostics.
+
+    Each subclass defines `_current_data`, returning its coordinator data
+    built from the store.
+    """
+
+    def __init__(
+        self,
+        hass,
+        api: AsyncConfigEntryAuth,
+        store: SystemStore,
+        semaphore: asyncio.Semaphore,
+        registry: FreshnessRegistry,
+        name: str,
+        update_interval: timedelta,
+        **kwargs: Any,
+    ) -> None:
         self.api = api
-        self.shared_data = shared_data
-        super().__init__(hass, _LOGGER, name="Full Coordinator", update_interval=timedelta(minutes=60))
+        self.store = store
+        self._semaphore = semaphore
+        self._registry = registry
+        self._notified: dict | None = None
+        self._notified_success = True
+        self.cycles: deque[tuple[float, float, bool]] = deque(maxlen=COORDINATOR_CYCLE_HISTORY)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{name} {store['system_sn']}",
+            update_interval=update_interval,
+            **kwargs,
+        )
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh as DataUpdateCoordinator does, recording the cycle timing."""
+        started_at = time.time()
+        started = time.monotonic()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            self.cycles.append((started_at, time.monotonic() - started, self.last_update_success))
+
+    async def _async_fetch(self, calls: dict[str, Callable[[], Awaitable[Any]]]) -> None:
+        """Run the endpoint calls concurrently and publish the results in the store.
+
+        A failed call keeps the previous value of its key; the cycle only
+        fails when every call failed.
+        """
+        system_sn = self.store["system_sn"]
+
+        async def _run(call: Callable[[], Awaitable[Any]]) -> Any:
+            async with self._semaphore:
+                return await call()
+
+        results = await asyncio.gather(
+            *(
+                self._registry.async_fetch(
+                    system_sn, key, self.name, self.update_interval, partial(_run, call)
+                )
+                for key, call in calls.items()
+            ),
+            return_exceptions=True,
+        )
+
+        failed = []
+        changes = {}
+        for key, result in zip(calls, results):
+            if isinstance(result, BaseException):
+                _LOGGER.warning("%s: failed to refresh %s, keeping previous data: %s", self.name, key, result)
+                failed.append(key)
+            elif result is not SKIPPED:
+                changes[key] = result
+        self.store.update(changes)
+
+        if failed and len(failed) == len(calls):
+            raise UpdateFailed(f"All endpoints failed: {', '.join(failed)}")
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners whose data key changed since the last notification.
+
+        Listeners without a context are always notified, and all listeners
+        are when the update success changed.
+        """
+        notified = self._notified_data()
+        if self._notified is None or self.last_update_success != self._notified_success:
+            changed = None
+        else:
+            changed = {key for key, value in notified.items() if self._notified.get(key) != value}
+        self._notified = notified
+        self._notified_success = self.last_update_success
+
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+
+    def _notified_data(self) -> dict:
+        """Return each data key's value together with its endpoint's staleness."""
+        system_sn = self.store["system_sn"]
+        return {
+            key: (
+                value,
+                self.api.stale_since(ENDPOINT_NAMES[key], system_sn) if key in ENDPOINT_NAMES else None,
+            )
+            for key, value in (self.data or {}).items()
+        }
+
+    @callback
+    def async_apply(self, changes: Mapping[str, Any]) -> None:
+        """Publish data written to the API without polling it back."""
+        if self.store.update(changes):
+            self.async_set_updated_data(self._current_data())
+
+    @callback
+    def async_restore(self) -> None:
+        """Publish the restored store data as the coordinator data, without fetching."""
+        self.data = self._current_data()
+
+
+class SunPowerFullCoordinator(SunPowerCoordinator):
+    def __init__(self, hass, api, store, semaphore: asyncio.Semaphore, registry: FreshnessRegistry):
+        super().__init__(hass, api, store, semaphore, registry, "Full Coordinator", FULL_UPDATE_INTERVAL)
 
     async def _async_update_data(self):
-        systems = await self.api.async_get_systems()
-        system = systems.get("systems", [{}])[0]
-        system_sn = system.get("system_sn")
+        system_sn = self.store["system_sn"]
+        async with self._semaphore:
+            systems = await self.api.async_get_systems()
+        system = next((s for s in systems if s.system_sn == system_sn), None)
 
-        if not system_sn:
-            _LOGGER.warning("Missing system_sn in response.")
-            raise UpdateFailed("No system serial number")
-
-        self.shared_data["system_sn"] = system_sn
-        self.shared_data["system"] = system
-        self.shared_data["details"] = await self.api.async_get_system_details(system_sn)
-        self.shared_data["power"] = await self.api.async_get_system_power(system_sn)
-        self.shared_data["energy"] = await self.api.async_get_system_energy(system_sn)
-        self.shared_data["battery_ups"] = await self.api.get_battery_ups_state(system_sn)
-        self.shared_data["charging_schedule"] = await self.api.async_get_charging_schedule(system_sn)
-        self.shared_data["discharging_schedule"] = await self.api.async_get_discharging_schedule(system_sn)
-        self.shared_data["export_limit"] = await self.api.async_get_export_limit(system_sn)
-
-        return dict(self.shared_data)
-
-class SunPowerRealtimeCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, api, shared_data):
-        self.api = api
-        self.shared_data = shared_data
-        super().__init__(hass, _LOGGER, name="Realtime Coordinator", update_interval=timedelta(seconds=10))
+        if system is None:
+            _LOGGER.warning("System %s missing from systems response.", system_sn)
+            raise UpdateFailed(f"System {system_sn} not found in account")
+
+        self.store.update({"system": system})
+
+        await self._async_fetch({
+            "details": lambda: self.api.async_get_system_details(system_sn),
+            "power": lambda: self.api.async_get_system_power(system_sn),
+            "energy": lambda: self.api.async_get_system_energy(system_sn),
+            "battery_ups": lambda: self.api.get_battery_ups_state(system_sn),
+            "charging_schedule": lambda: self.api.async_get_charging_schedule(system_sn),
+            "discharging_schedule": lambda: self.api.async_get_discharging_schedule(system_sn),
+            "export_limit": lambda: self.api.async_get_export_limit(system_sn),
+        })
+
+        return self._current_data()
+
+    def _current_data(self) -> Mapping[str, Any]:
+        # The snapshot is immutable, so it is published without copying
+        return self.store.snapshot
+
+
+class SunPowerRealtimeCoordinator(SunPowerCoordinator):
+    """Poll power_meter, aligned to the backend's own sample cadence.
+
+    Each new sample is appended to `samples`, and the cadence and upload
+    lag are learned from its `timestamp`; polls are scheduled just after
+    the next sample should be available. The samples also feed the energy
+    estimates published between energy_meter polls. Polls returning an
+    already seen sample do not notify entities, and idle nights (no PV,
+    battery idle, sun down) back off to REALTIME_NIGHT_INTERVAL.
+
+    Systems sharing the backend's sample clock would all be polled in the
+    same second, so `poll_offset`, wrapped to the cadence, is added to
+    every aligned delay to keep the systems staggered.
+    """
+
+    def __init__(
+        self,
+        hass,
+        api,
+        store,
+        semaphore: asyncio.Semaphore,
+        registry: FreshnessRegistry,
+        samples: PowerSampleBuffer,
+        poll_offset: timedelta = timedelta(0),
+    ):
+        self.samples = samples
+        self._poll_offset = poll_offset
+        self._energy = EnergyInterpolator(samples, store.get("energy_estimate"))
+        self._sample_ts: int | None = None
+        self._cadences: deque[float] = deque(maxlen=REALTIME_CADENCE_WINDOW)
+        self._lags: deque[float] = deque(maxlen=REALTIME_CADENCE_WINDOW)
+        super().__init__(
+            hass,
+            api,
+            store,
+            semaphore,
+            registry,
+            "Realtime Coordinator",
+            REALTIME_UPDATE_INTERVAL,
+            always_update=False,
+        )
 
     async def _async_update_data(self):
-        system_sn = self.shared_data.get("system_sn")
+        system_sn = self.store.get("system_sn")
         if not system_sn:
             raise UpdateFailed("system_sn not initialized yet")
 
-        self.shared_data["power"] = await self.api.async_get_system_power(system_sn)
+        async def _fetch_power() -> PowerMeter:
+            async with self._semaphore:
+                return await self.api.async_get_system_power(system_sn)
 
-        return {"power": self.shared_data["power"]}
-    
-class SunPowerPeriodicCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, api, shared_data):
-        self.api = api
-        self.shared_data = shared_data
-        super().__init__(hass, _LOGGER, name="Periodic Coordinator", update_interval=timedelta(minutes=10))
+        power = await self._registry.async_fetch(
+            system_sn, "power", self.name, self.update_interval, _fetch_power
+        )
+        if power is SKIPPED:
+            return self._current_data()
+
+        now = time.time()
+        timestamp = power.timestamp
+
+        if power.status == "dummy_data" or timestamp is None:
+            self.update_interval = REALTIME_UPDATE_INTERVAL
+        elif self._sample_ts is not None and timestamp <= self._sample_ts:
+            # Same sample as the previous poll: unchanged data keeps the
+            # coordinator from notifying its entities, unless it went stale.
+            # An older one is dropped, `samples` must stay in time order.
+            self.update_interval = self._next_interval(power, now)
+            if timestamp < self._sample_ts:
+                return self._current_data()
+        else:
+            if self._sample_ts is not None:
+                self._cadences.append(timestamp - self._sample_ts)
+            self._lags.append(now - timestamp)
+            self._sample_ts = timestamp
+            self.samples.append(power)
+            self.update_interval = self._next_interval(power, now)
+
+        self.store.update({"power": power})
+        return self._current_data()
+
+    def _current_data(self) -> dict:
+        # Kept in the store so the snapshot restores the estimates too
+        self.store.update({"energy_estimate": self._energy.update(self.store["energy"])})
+        return {
+            "power": self.store["power"],
+            "energy_estimate": self.store["energy_estimate"],
+            "stale_since": self.api.stale_since("power_meter", self.store["system_sn"]),
+        }
+
+    def _next_interval(self, power: PowerMeter, now: float) -> timedelta:
+        """Return the delay until just after the next sample is expected."""
+        if self._is_idle_night(power):
+            return REALTIME_NIGHT_INTERVAL
+        if not self._cadences:
+            return REALTIME_UPDATE_INTERVAL
+
+        cadence = median(self._cadences)
+        expected = self._sample_ts + cadence + min(self._lags)
+        offset = self._poll_offset.total_seconds() % cadence if cadence > 0 else 0
+        delay = expected + REALTIME_POLL_DELAY.total_seconds() + offset - now
+        return timedelta(
+            seconds=min(
+                max(delay, REALTIME_MIN_INTERVAL.total_seconds()),
+                REALTIME_MAX_INTERVAL.total_seconds(),
+            )
+        )
+
+    def _is_idle_night(self, power: PowerMeter) -> bool:
+        """Return True when nothing is produced or stored and the sun is down."""
+        p_storage = power.p_storage
+        return (
+            power.p_pv == 0
+            and p_storage is not None
+            and abs(p_storage) <= BATTERY_IDLE_POWER
+            and not is_up(self.hass)
+        )
+
+class SunPowerPeriodicCoordinator(SunPowerCoordinator):
+    def __init__(self, hass, api, store, semaphore: asyncio.Semaphore, registry: FreshnessRegistry):
+        super().__init__(hass, api, store, semaphore, registry, "Periodic Coordinator", PERIODIC_UPDATE_INTERVAL)
 
     async def _async_update_data(self):
-        system_sn = self.shared_data.get("system_sn")
+        system_sn = self.store.get("system_sn")
         if not system_sn:
             raise UpdateFailed("system_sn not initialized yet")
 
-        self.shared_data["energy"] = await self.api.async_get_system_energy(system_sn)
-        self.shared_data["battery_ups"] = await self.api.get_battery_ups_state(system_sn)
-        self.shared_data["charging_schedule"] = await self.api.async_get_charging_schedule(system_sn)
-        self.shared_data["discharging_schedule"] = await self.api.async_get_discharging_schedule(system_sn)
-        self.shared_data["export_limit"] = await self.api.async_get_export_limit(system_sn)
+        await self._async_fetch({
+            "energy": lambda: self.api.async_get_system_energy(system_sn),
+            "battery_ups": lambda: self.api.get_battery_ups_state(system_sn),
+            "charging_schedule": lambda: self.api.async_get_charging_schedule(system_sn),
+            "discharging_schedule": lambda: self.api.async_get_discharging_schedule(system_sn),
+            "export_limit": lambda: self.api.async_get_export_limit(system_sn),
+        })
+
+        return self._current_data()
 
+    def _current_data(self) -> dict:
         return {
-            "energy": self.shared_data["energy"],
-            "battery_ups": self.shared_data["battery_ups"],
-            "charging_schedule": self.shared_data["charging_schedule"],
-            "discharging_schedule": self.shared_data["discharging_schedule"],
-            "export_limit": self.shared_data["export_limit"],
+            "energy": self.store["energy"],
+            "battery_ups": self.store["battery_ups"],
+            "charging_schedule": self.store["charging_schedule"],
+            "discharging_schedule": self.store["discharging_schedule"],
+            "export_limit": self.store["export_limit"],
         }
-
-        
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Diagnostics support for SunPower Maxeon."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import API_BASE_URL, DOMAIN
+from .coordinator import SunPowerCoordinator
+from .models import dump_system_data
+
+TO_REDACT = {"system_sn", "access_token", "refresh_token", "token"}
+
+_COORDINATORS = ("full", "realtime", "periodic")
+
+
+def _timestamp(at: float) -> str:
+    return dt_util.utc_from_timestamp(at).isoformat()
+
+
+def _coordinator_diagnostics(coordinator: SunPowerCoordinator) -> dict[str, Any]:
+    interval = coordinator.update_interval
+    return {
+        "update_interval": None if interval is None else interval.total_seconds(),
+        "last_update_success": coordinator.last_update_success,
+        "cycles": [
+            {"started_at": _timestamp(started_at), "duration": round(duration, 3), "success": success}
+            for started_at, duration, success in coordinator.cycles
+        ],
+    }
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the data, request trace and refresh cycles of every system.
+
+    Serials are replaced by a label per system, so requests and data of
+    the same system can still be matched.
+    """
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    systems = entry_data["systems"]
+    metrics = entry_data["api"].metrics
+    labels = {system_sn: f"system_{index}" for index, system_sn in enumerate(systems, 1)}
+
+    def _path(url: str) -> str:
+        path = url.removeprefix(API_BASE_URL)
+        for system_sn, label in labels.items():
+            path = path.replace(system_sn, label)
+        return path
+
+    return {
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+        "api": {
+            "requests_last_hour": metrics.requests_last_hour,
+            "endpoints": metrics.as_dict(),
+            "trace": [
+                {
+                    **record.as_dict(),
+                    "at": _timestamp(record.at),
+                    "url": _path(record.url),
+                    "latency": None if record.latency is None else round(record.latency, 3),
+                }
+                for record in metrics.trace
+            ],
+        },
+        "systems": [
+            {
+                "system": labels[system_sn],
+                "data": async_redact_data(dump_system_data(system["store"].snapshot), TO_REDACT),
+                "coordinators": {key: _coordinator_diagnostics(system[key]) for key in _COORDINATORS},
+            }
+            for system_sn, system in systems.items()
+        ],
+    }
@@ -0,0 +1,159 @@
+"""Request metrics of the SunPower Maxeon API client."""
+
+import asyncio
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import math
+import time
+from typing import Any
+
+from .const import METRICS_LATENCY_WINDOW, REQUEST_TRACE_SIZE
+
+
+def _percentile(values: list[float], percent: float) -> float | None:
+    """Return the nearest-rank percentile of `values`, or None if empty."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+class RequestRecord:
+    """One entry of the request trace.
+
+    `source` is "api" for an HTTP attempt, "cache" for an answer served
+    from the response cache, "coalesced" for a caller that joined a
+    request in flight, and "fallback" or "default" when a failure was
+    answered with the last good or the built-in payload.
+    """
+
+    __slots__ = ("at", "key", "url", "source", "status", "latency", "bytes")
+
+    def __init__(self, key: str, url: str, source: str) -> None:
+        self.at = time.time()
+        self.key = key
+        self.url = url
+        self.source = source
+        # HTTP status, or the exception name when there was no response
+        self.status: int | str | None = None
+        self.latency: float | None = None
+        self.bytes = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class EndpointMetrics:
+    """Counters and recent latencies of one endpoint."""
+
+    __slots__ = ("requests", "errors", "fallbacks", "cache_hits", "coalesced", "bytes_received", "latencies")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.bytes_received = 0
+        # Seconds, of the last METRICS_LATENCY_WINDOW requests
+        self.latencies: deque[float] = deque(maxlen=METRICS_LATENCY_WINDOW)
+
+    def as_dict(self) -> dict[str, int | float | None]:
+        latencies = list(self.latencies)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "bytes_received": self.bytes_received,
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+        }
+
+
+class ApiMetrics:
+    """Per-endpoint request metrics, keyed like "GET power_meter".
+
+    Every HTTP attempt counts as a request, retries included; answers
+    served from the response cache count as cache hits, and callers
+    joining an identical request in flight as coalesced instead. The
+    requests of the last hour are counted in one-minute buckets.
+
+    The last REQUEST_TRACE_SIZE requests, cache hits and fallbacks are
+    also kept as RequestRecords in `trace`, only formatted when read.
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.trace: deque[RequestRecord] = deque(maxlen=REQUEST_TRACE_SIZE)
+        self._minutes: deque[list[int]] = deque(maxlen=60)
+
+    def endpoint(self, key: str) -> EndpointMetrics:
+        if (metrics := self.endpoints.get(key)) is None:
+            metrics = self.endpoints[key] = EndpointMetrics()
+        return metrics
+
+    @contextmanager
+    def measure(self, key: str, url: str) -> Iterator[RequestRecord]:
+        """Count, time and trace a request, as an error if it raises.
+
+        The caller sets the status and size on the yielded record.
+        """
+        metrics = self.endpoint(key)
+        record = RequestRecord(key, url, "api")
+        started = time.monotonic()
+        self._count_minute(started)
+        metrics.requests += 1
+        try:
+            yield record
+        except asyncio.CancelledError:
+            record.status = "cancelled"
+            raise
+        except Exception as err:
+            metrics.errors += 1
+            if record.status is None:
+                record.status = getattr(err, "status", None) or type(err).__name__
+            raise
+        finally:
+            record.latency = time.monotonic() - started
+            metrics.latencies.append(record.latency)
+            metrics.bytes_received += record.bytes
+            self.trace.append(record)
+
+    def record_cache_hit(self, key: str, url: str) -> None:
+        self.endpoint(key).cache_hits += 1
+        self.trace.append(RequestRecord(key, url, "cache"))
+
+    def record_coalesced(self, key: str, url: str) -> None:
+        self.endpoint(key).coalesced += 1
+        self.trace.append(RequestRecord(key, url, "coalesced"))
+
+    def record_fallback(self, key: str, url: str, stale: bool) -> None:
+        """Count a failure answered with the last good (stale) or built-in payload."""
+        self.endpoint(key).fallbacks += 1
+        self.trace.append(RequestRecord(key, url, "fallback" if stale else "default"))
+
+    def _count_minute(self, now: float) -> None:
+        minute = int(now // 60)
+        if self._minutes and self._minutes[-1][0] == minute:
+            self._minutes[-1][1] += 1
+        else:
+            self._minutes.append([minute, 1])
+
+    @property
+    def requests_last_hour(self) -> int:
+        since = int(time.monotonic() // 60) - 59
+        return sum(count for minute, count in self._minutes if minute >= since)
+
+    def total(self, counter: str) -> int:
+        """Return a counter summed over every endpoint."""
+        return sum(getattr(metrics, counter) for metrics in self.endpoints.values())
+
+    def latency(self, percent: float) -> float | None:
+        """Return a latency percentile in seconds over every endpoint."""
+        return _percentile([latency for metrics in self.endpoints.values() for latency in metrics.latencies], percent)
+
+    def as_dict(self) -> dict[str, dict]:
+        return {key: metrics.as_dict() for key, metrics in sorted(self.endpoints.items())}
@@ -0,0 +1,224 @@
+"""Typed models of the SunPower Maxeon API payloads."""
+
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass, field, fields
+import re
+from typing import Any, Self
+
+_TIME = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)(:[0-5]\d)?$")
+
+# Epoch timestamps above this are in milliseconds
+_MAX_SECONDS_TIMESTAMP = 10**11
+
+
+class SchemaError(ValueError):
+    """An API payload does not match the expected schema."""
+
+
+def _number(value: Any) -> int | float:
+    """Accept numbers and numeric strings, keeping integers integral."""
+    if isinstance(value, bool):
+        raise TypeError(f"expected a number, got {value!r}")
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        number = float(value)
+        return int(number) if number.is_integer() and "." not in value else number
+    raise TypeError(f"expected a number, got {value!r}")
+
+
+def _timestamp(value: Any) -> int:
+    """Accept epoch seconds or milliseconds, returning seconds."""
+    timestamp = int(_number(value))
+    return timestamp // 1000 if timestamp > _MAX_SECONDS_TIMESTAMP else timestamp
+
+
+def _boolean(value: Any) -> bool:
+    """Accept booleans, 0/1 and their string forms."""
+    if isinstance(value, bool):
+        return value
+    if value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in ("true", "false", "1", "0"):
+        return value.lower() in ("true", "1")
+    raise TypeError(f"expected a boolean, got {value!r}")
+
+
+def _text(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError(f"expected a string, got {value!r}")
+    return value
+
+
+def _time(value: Any) -> str:
+    """Accept H:MM, HH:MM or HH:MM:SS, returning HH:MM."""
+    if not isinstance(value, str) or (match := _TIME.match(value)) is None:
+        raise ValueError(f"expected a time of day, got {value!r}")
+    return f"{int(match[1]):02d}:{match[2]}"
+
+
+def _field(parse: Callable[[Any], Any], required: bool = False) -> Any:
+    return field(default=None, metadata={"parse": parse, "required": required})
+
+
+@dataclass(frozen=True, slots=True)
+class _Model:
+    """Base of the payload models, parsed and validated by `from_dict`."""
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Self:
+        """Parse a JSON object, raising SchemaError if it does not fit the model.
+
+        Unknown keys are ignored; missing optional fields and null values
+        become None.
+        """
+        if not isinstance(data, Mapping):
+            raise SchemaError(f"{cls.__name__}: expected an object, got {type(data).__name__}")
+        values = {}
+        for model_field in fields(cls):
+            value = data.get(model_field.name)
+            if value is None:
+                if model_field.metadata["required"]:
+                    raise SchemaError(f"{cls.__name__}: missing {model_field.name}")
+                continue
+            try:
+                values[model_field.name] = model_field.metadata["parse"](value)
+            except (TypeError, ValueError) as err:
+                raise SchemaError(f"{cls.__name__}.{model_field.name}: {err}") from err
+        return cls(**values)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model as a JSON-serializable dict."""
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class System(_Model):
+    """A system from the systems list, or the details of one system."""
+
+    system_sn: str | None = _field(_text, required=True)
+    active_at: int | None = _field(_timestamp)
+    installed_pv_power: float | None = _field(_number)
+    inverter_model: str | None = _field(_text)
+    inverter_rated_power: float | None = _field(_number)
+    battery_model: str | None = _field(_text)
+    battery_capacity: float | None = _field(_number)
+    battery_usable_capacity: float | None = _field(_number)
+    meter_type: str | None = _field(_text)
+    feedin_threshold: float | None = _field(_number)
+    inv_version: str | None = _field(_text)
+    ems_version: str | None = _field(_text)
+    bms_version: str | None = _field(_text)
+    status: str | None = _field(_text)
+
+
+@dataclass(frozen=True, slots=True)
+class PowerMeter(_Model):
+    """Realtime power in W, positive for PV production, grid import and battery discharge."""
+
+    timestamp: int | None = _field(_timestamp, required=True)
+    p_pv: float | None = _field(_number)
+    p_grid: float | None = _field(_number)
+    p_storage: float | None = _field(_number)
+    p_consumption: float | None = _field(_number)
+    soc: float | None = _field(_number)
+    status: str | None = _field(_text)
+
+
+@dataclass(frozen=True, slots=True)
+class EnergyMeter(_Model):
+    """Energy counters in kWh."""
+
+    timestamp: int | None = _field(_timestamp, required=True)
+    e_pv_generation: float | None = _field(_number)
+    e_storage_charge: float | None = _field(_number)
+    e_storage_discharge: float | None = _field(_number)
+    e_grid_import: float | None = _field(_number)
+    e_grid_export: float | None = _field(_number)
+    e_consumption: float | None = _field(_number)
+    p_max_charge: float | None = _field(_number)
+    p_max_discharge: float | None = _field(_number)
+    status: str | None = _field(_text)
+
+
+@dataclass(frozen=True, slots=True)
+class _Schedule(_Model):
+    enable: bool | None = _field(_boolean)
+    start_time_1: str | None = _field(_time)
+    end_time_1: str | None = _field(_time)
+    start_time_2: str | None = _field(_time)
+    end_time_2: str | None = _field(_time)
+
+
+@dataclass(frozen=True, slots=True)
+class ChargingSchedule(_Schedule):
+    """Battery charging windows, up to max_soc %."""
+
+    max_soc: float | None = _field(_number)
+
+
+@dataclass(frozen=True, slots=True)
+class DischargingSchedule(_Schedule):
+    """Battery discharging windows, down to min_soc %."""
+
+    min_soc: float | None = _field(_number)
+
+
+@dataclass(frozen=True, slots=True)
+class BatteryUps(_Model):
+    """Whether the battery backs up the home during outages."""
+
+    enable: bool | None = _field(_boolean)
+
+
+@dataclass(frozen=True, slots=True)
+class ExportLimit(_Model):
+    """Grid export limit in % of the inverter rated power."""
+
+    enable: bool | None = _field(_boolean)
+    export_rate: float | None = _field(_number)
+
+
+def parse_systems(data: Any) -> tuple[System, ...]:
+    """Parse the systems response into its systems."""
+    if not isinstance(data, Mapping) or not isinstance(systems := data.get("systems"), list):
+        raise SchemaError("systems: expected an object with a systems list")
+    return tuple(System.from_dict(system) for system in systems)
+
+
+# Model of every store key holding a payload, and the empty value it starts with
+STORE_MODELS: dict[str, type[_Model]] = {
+    "system": System,
+    "details": System,
+    "power": PowerMeter,
+    "energy": EnergyMeter,
+    "battery_ups": BatteryUps,
+    "charging_schedule": ChargingSchedule,
+    "discharging_schedule": DischargingSchedule,
+    "export_limit": ExportLimit,
+}
+
+SYSTEM_DATA_DEFAULTS: dict[str, Any] = {
+    "system_sn": None,
+    **{key: model() for key, model in STORE_MODELS.items()},
+    "energy_estimate": {},
+}
+
+
+def dump_system_data(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a system's store data as JSON-serializable dicts."""
+    return {key: value.as_dict() if isinstance(value, _Model) else value for key, value in data.items()}
+
+
+def load_system_data(data: Mapping[str, Any]) -> dict[str, Any]:
+    """Parse data saved by dump_system_data, dropping keys that no longer fit."""
+    loaded = {}
+    for key, value in data.items():
+        if (model := STORE_MODELS.get(key)) is None:
+            loaded[key] = value
+            continue
+        try:
+            loaded[key] = model.from_dict(value)
+        except SchemaError:
+            continue
+    return loaded
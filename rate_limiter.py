@@ -0,0 +1,71 @@
+"""Client-side rate limiting for the SunPower Maxeon API."""
+
+import asyncio
+import heapq
+import itertools
+import time
+
+# Lower values are served first
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+
+
+class RateLimiter:
+    """Token bucket shared by every request made with one account.
+
+    Waiting requests are released in priority order, so a user-initiated
+    write never queues behind background reads. `defer` holds all requests
+    until a server-provided Retry-After has passed.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, priority: int = PRIORITY_READ) -> None:
+        """Wait until a request with `priority` may be sent."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._dispatch()
+        await future
+
+    def defer(self, seconds: float) -> None:
+        """Hold every request for at least `seconds`."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Release as many waiters as tokens allow and re-arm the timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                # The waiting request was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._resume_at:
+                delay = self._resume_at - now
+                break
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self._rate
+                break
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            future.set_result(None)
+        else:
+            return
+
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
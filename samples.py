@@ -0,0 +1,184 @@
+"""In-memory history of realtime power samples."""
+
+from array import array
+from collections.abc import Iterator, Mapping
+import math
+
+from .const import ENERGY_INTERPOLATION_MAX_GAP, ENERGY_POWER_SOURCES
+from .models import EnergyMeter, PowerMeter
+
+SAMPLE_FIELDS = ("timestamp", "p_pv", "p_grid", "p_storage", "p_consumption", "soc")
+
+_HOUR = 3600
+
+
+class PowerSampleBuffer:
+    """Fixed-capacity ring buffer of power_meter samples.
+
+    Every field is kept in its own preallocated array of doubles, so
+    appending is O(1) and never allocates, and windows are memoryview
+    slices of those arrays instead of copies. Missing values are NaN.
+    Samples must be appended in increasing timestamp order.
+    """
+
+    __slots__ = ("capacity", "_columns", "_views", "_start", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._columns = {field: array("d", [math.nan]) * capacity for field in SAMPLE_FIELDS}
+        self._views = {field: memoryview(column) for field, column in self._columns.items()}
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, sample: PowerMeter) -> None:
+        """Add a sample, overwriting the oldest one when the buffer is full."""
+        index = (self._start + self._size) % self.capacity
+        for field, column in self._columns.items():
+            value = getattr(sample, field)
+            column[index] = math.nan if value is None else value
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def _index(self, position: int) -> int:
+        """Map a chronological position to an array index."""
+        return (self._start + position) % self.capacity
+
+    def _first_position(self, since: float) -> int:
+        """Return the position of the first sample with timestamp >= since."""
+        timestamps = self._columns["timestamp"]
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[self._index(middle)] < since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def window(
+        self, field: str, since: float | None = None, until: float | None = None
+    ) -> tuple[memoryview, ...]:
+        """Return zero-copy views of `field` for samples with since <= timestamp < until.
+
+        The views are in chronological order; there are two when the window
+        wraps around the end of the ring.
+        """
+        first = 0 if since is None else self._first_position(since)
+        last = self._size if until is None else self._first_position(until)
+        count = last - first
+        if count <= 0:
+            return ()
+        view = self._views[field]
+        begin = self._index(first)
+        end = begin + count
+        if end <= self.capacity:
+            return (view[begin:end],)
+        return (view[begin:], view[: end - self.capacity])
+
+    def values(
+        self, field: str, since: float | None = None, until: float | None = None
+    ) -> Iterator[float]:
+        """Iterate over `field` for samples with since <= timestamp < until."""
+        for segment in self.window(field, since, until):
+            yield from segment
+
+    def energy(
+        self, field: str, sign: int, since: float | None = None, until: float | None = None
+    ) -> float:
+        """Return the kWh of positive `sign * field` power between since and until.
+
+        Uses the trapezoidal rule, without integrating across gaps longer
+        than ENERGY_INTERPOLATION_MAX_GAP or across missing values.
+        """
+        max_gap = ENERGY_INTERPOLATION_MAX_GAP.total_seconds()
+        total = 0.0
+        previous_ts = previous_power = None
+        for timestamp, power in zip(
+            self.values("timestamp", since, until), self.values(field, since, until)
+        ):
+            if math.isnan(power):
+                previous_ts = None
+                continue
+            power = max(sign * power, 0.0)
+            if previous_ts is not None and timestamp - previous_ts <= max_gap:
+                total += (timestamp - previous_ts) * (power + previous_power) / 2
+            previous_ts, previous_power = timestamp, power
+        # Watt-seconds to kWh
+        return total / 3_600_000
+
+    def complete_hours(self, until: float, after: float | None = None) -> range:
+        """Return the starts of the whole UTC hours the buffer covers, ended by `until`.
+
+        Hours are aligned to the epoch, not to the local clock, so that
+        timezones with a :30 or :45 offset get whole hours too. With
+        `after`, only the hours following the one starting then.
+        """
+        first = self.first("timestamp")
+        if first is None:
+            return range(0)
+        start = math.ceil(first / _HOUR) * _HOUR
+        if after is not None:
+            start = max(start, int(after) + _HOUR)
+        return range(start, int(until) // _HOUR * _HOUR, _HOUR)
+
+    def first(self, field: str) -> float | None:
+        """Return the oldest value of `field`, if known."""
+        if not self._size:
+            return None
+        value = self._columns[field][self._start]
+        return None if math.isnan(value) else value
+
+    def latest(self, field: str) -> float | None:
+        """Return the most recent value of `field`, if known."""
+        if not self._size:
+            return None
+        value = self._columns[field][self._index(self._size - 1)]
+        return None if math.isnan(value) else value
+
+
+class EnergyInterpolator:
+    """Estimate the energy counters between energy_meter readings.
+
+    The power flowing in each counter's direction is integrated with the
+    trapezoidal rule over the samples taken since the last reading, and
+    added to that reading. Estimates never decrease: when a new reading is
+    below the value already reported, the counter holds until the
+    integration catches up. Only a reading below the previous reading, a
+    meter reset, is followed downwards.
+    """
+
+    __slots__ = ("_samples", "_reading_ts", "_readings", "_values")
+
+    def __init__(self, samples: PowerSampleBuffer, values: Mapping[str, float] | None = None) -> None:
+        self._samples = samples
+        self._reading_ts: float | None = None
+        self._readings: dict[str, float] = {}
+        self._values: dict[str, float] = dict(values or {})
+
+    def update(self, energy: EnergyMeter) -> dict[str, float]:
+        """Return the estimated counters, in kWh, given the latest energy_meter data."""
+        timestamp = energy.timestamp
+        if timestamp is not None and timestamp != self._reading_ts:
+            for key in ENERGY_POWER_SOURCES:
+                reading = getattr(energy, key)
+                if reading is None:
+                    continue
+                previous = self._readings.get(key)
+                if previous is not None and reading < previous:
+                    self._values.pop(key, None)
+                self._readings[key] = reading
+            self._reading_ts = timestamp
+
+        for key, (field, sign) in ENERGY_POWER_SOURCES.items():
+            reading = self._readings.get(key)
+            if reading is None:
+                continue
+            estimate = reading + self._samples.energy(field, sign, self._reading_ts)
+            self._values[key] = max(estimate, self._values.get(key, estimate))
+
+        return {key: round(value, 3) for key, value in self._values.items()}
@@ -1,465 +1,507 @@
 """Sensor platform for SunPower Maxeon integration."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 import logging
-from typing import Optional
-
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from operator import attrgetter
+from typing import Any
 
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.components.sensor import (
-    SensorEntity,
+    RestoreSensor,
     SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, ENERGY_SENSOR_KEYS
-from .coordinator import SunPowerFullCoordinator, SunPowerRealtimeCoordinator, SunPowerPeriodicCoordinator
+from .api import is_fallback
+from .const import DOMAIN, ENERGY_SENSOR_KEYS, SYSTEM_INFO_ATTRIBUTES
+from .coordinator import ENDPOINT_NAMES, SunPowerCoordinator
+from .metrics import ApiMetrics
+from .models import SYSTEM_DATA_DEFAULTS
 
 _LOGGER = logging.getLogger(__name__)
 
+# Only the API metrics sensors poll; they read counters, not the API
+SCAN_INTERVAL = timedelta(minutes=1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SunPowerEntityDescription:
+    """Describe where a SunPower entity reads its data."""
+
+    # Coordinator of the system the entity listens to
+    coordinator: str
+    # Store key holding the payload the entity shows
+    data_key: str
+    # Appended to the system serial to form the unique ID
+    unique_id_suffix: str
+    value_fn: Callable[[Any], Any]
+    attributes_fn: Callable[[Any], dict[str, Any]] | None = None
+    # Icon depending on the state; the static `icon` is used otherwise
+    icon_fn: Callable[[Any], str] | None = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class SunPowerSensorEntityDescription(SensorEntityDescription, SunPowerEntityDescription):
+    """Describe a SunPower sensor."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class SunPowerBinarySensorEntityDescription(BinarySensorEntityDescription, SunPowerEntityDescription):
+    """Describe a SunPower binary sensor."""
+
+
+@dataclass(frozen=True, kw_only=True)
+class SunPowerApiSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor showing the API client's request metrics."""
+
+    value_fn: Callable[[ApiMetrics], Any]
+    # Per-endpoint breakdown of the value, by metrics key
+    endpoint_fn: Callable[[ApiMetrics], dict[str, Any]]
+
+
+_ENERGY_ICONS = {
+    "e_pv_generation": "mdi:solar-panel",
+    "e_storage_charge": "mdi:battery-arrow-up",
+    "e_storage_discharge": "mdi:battery-arrow-down",
+    "e_grid_import": "mdi:transmission-tower-export",
+    "e_grid_export": "mdi:transmission-tower-import",
+    "e_consumption": "mdi:home-lightning-bolt",
+}
+
+# Indexed by tens of percent
+_SOC_ICONS = ("mdi:battery-outline", *(f"mdi:battery-{tens}0" for tens in range(1, 10)), "mdi:battery")
+
+
+def _soc_icon(soc: float | None) -> str:
+    if soc is None:
+        return "mdi:battery-unknown"
+    return _SOC_ICONS[int(max(0, min(100, soc))) // 10]
+
+
+def _schedule_state(schedule: Any) -> str:
+    return "enabled" if schedule.enable else "disabled"
+
+
+def _schedule_attributes(*limits: str) -> Callable[[Any], dict[str, Any]]:
+    fields = ("start_time_1", "end_time_1", "start_time_2", "end_time_2", *limits)
+    return lambda schedule: {field: getattr(schedule, field) for field in fields}
+
+
+def _system_attributes(system: Any) -> dict[str, Any]:
+    return {
+        key: value
+        for key in SYSTEM_INFO_ATTRIBUTES
+        if (value := getattr(system, key)) is not None
+    }
+
+
+SENSORS: tuple[SunPowerSensorEntityDescription, ...] = (
+    # Metadata / status
+    SunPowerSensorEntityDescription(
+        key="system",
+        coordinator="full",
+        data_key="system",
+        unique_id_suffix="sunpower_device_info",
+        translation_key="sunpower_maxeon_system",
+        icon="mdi:solar-power",
+        value_fn=lambda system: system.status or "unknown",
+        attributes_fn=_system_attributes,
+    ),
+    # Static system detail sensors
+    *(
+        SunPowerSensorEntityDescription(
+            key=key,
+            coordinator="full",
+            data_key="details",
+            unique_id_suffix=f"sms_{key}",
+            translation_key=key,
+            icon=icon,
+            device_class=device_class,
+            native_unit_of_measurement=unit,
+            value_fn=attrgetter(key),
+        )
+        for key, unit, device_class, icon in (
+            ("battery_capacity", "kWh", SensorDeviceClass.ENERGY, "mdi:battery"),
+            ("installed_pv_power", "kW", SensorDeviceClass.POWER, "mdi:solar-power"),
+            ("inverter_rated_power", "kW", SensorDeviceClass.POWER, "mdi:solar-power"),
+            ("battery_usable_capacity", "kWh", SensorDeviceClass.ENERGY, "mdi:battery"),
+            ("feedin_threshold", "%", None, "mdi:gauge"),
+        )
+    ),
+    # Power meter sensors
+    *(
+        SunPowerSensorEntityDescription(
+            key=key,
+            coordinator="realtime",
+            data_key="power",
+            unique_id_suffix=f"sm_power_{key}",
+            translation_key=key,
+            icon=icon,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement="W",
+            value_fn=attrgetter(key),
+        )
+        for key, icon in (
+            ("p_pv", "mdi:solar-panel"),
+            ("p_grid", "mdi:transmission-tower-export"),
+            ("p_storage", "mdi:battery"),
+            ("p_consumption", "mdi:home-lightning-bolt"),
+        )
+    ),
+    SunPowerSensorEntityDescription(
+        key="soc",
+        coordinator="realtime",
+        data_key="power",
+        unique_id_suffix="sm_power_soc",
+        translation_key="soc",
+        device_class=SensorDeviceClass.BATTERY,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="%",
+        value_fn=attrgetter("soc"),
+        icon_fn=_soc_icon,
+    ),
+    # Energy meter sensors
+    *(
+        SunPowerSensorEntityDescription(
+            key=key,
+            coordinator="periodic",
+            data_key="energy",
+            unique_id_suffix=f"sm_energy_{key}",
+            translation_key=key,
+            icon=_ENERGY_ICONS[key],
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            native_unit_of_measurement="kWh",
+            value_fn=attrgetter(key),
+        )
+        for key in ENERGY_SENSOR_KEYS
+    ),
+    # Energy estimated from realtime power between energy meter polls
+    *(
+        SunPowerSensorEntityDescription(
+            key=f"{key}_interpolated",
+            coordinator="realtime",
+            data_key="energy_estimate",
+            unique_id_suffix=f"sm_energy_{key}_interpolated",
+            translation_key=f"{key}_interpolated",
+            icon=_ENERGY_ICONS[key],
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            native_unit_of_measurement="kWh",
+            value_fn=lambda estimate, key=key: estimate.get(key),
+        )
+        for key in ENERGY_SENSOR_KEYS
+    ),
+    # Schedules
+    SunPowerSensorEntityDescription(
+        key="charging_schedule",
+        coordinator="periodic",
+        data_key="charging_schedule",
+        unique_id_suffix="sunpower_charging_schedule",
+        translation_key="charging_schedule",
+        icon="mdi:calendar-clock",
+        value_fn=_schedule_state,
+        attributes_fn=_schedule_attributes("max_soc"),
+    ),
+    SunPowerSensorEntityDescription(
+        key="discharging_schedule",
+        coordinator="periodic",
+        data_key="discharging_schedule",
+        unique_id_suffix="sunpower_discharging_schedule",
+        translation_key="discharging_schedule",
+        icon="mdi:calendar-clock",
+        value_fn=_schedule_state,
+        attributes_fn=_schedule_attributes("min_soc"),
+    ),
+    # Config sensors
+    SunPowerSensorEntityDescription(
+        key="export_limit",
+        coordinator="periodic",
+        data_key="export_limit",
+        unique_id_suffix="sunpower_export_limit",
+        translation_key="feedin_threshold",
+        icon="mdi:transmission-tower-export",
+        value_fn=lambda export_limit: "enabled" if export_limit.enable else "disabled",
+        attributes_fn=lambda export_limit: {"export_rate": export_limit.export_rate},
+    ),
+)
+
+BINARY_SENSORS: tuple[SunPowerBinarySensorEntityDescription, ...] = (
+    SunPowerBinarySensorEntityDescription(
+        key="battery_ups",
+        coordinator="periodic",
+        data_key="battery_ups",
+        unique_id_suffix="sunpower_ups",
+        translation_key="ups_enabled",
+        device_class=BinarySensorDeviceClass.POWER,
+        value_fn=lambda battery_ups: bool(battery_ups.enable),
+        icon_fn=lambda is_on: "mdi:battery" if is_on else "mdi:battery-off",
+    ),
+)
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _endpoint_values(counter: str) -> Callable[[ApiMetrics], dict[str, Any]]:
+    return lambda metrics: {key: getattr(endpoint, counter) for key, endpoint in metrics.endpoints.items()}
+
+
+def _endpoint_latencies(field: str) -> Callable[[ApiMetrics], dict[str, Any]]:
+    return lambda metrics: {
+        key: _milliseconds(endpoint.as_dict()[field]) for key, endpoint in metrics.endpoints.items()
+    }
+
+
+# Shown once per account, on the device of the first system
+API_SENSORS: tuple[SunPowerApiSensorEntityDescription, ...] = (
+    SunPowerApiSensorEntityDescription(
+        key="api_requests_last_hour",
+        translation_key="api_requests_last_hour",
+        icon="mdi:api",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="requests/h",
+        value_fn=lambda metrics: metrics.requests_last_hour,
+        endpoint_fn=_endpoint_values("requests"),
+    ),
+    *(
+        SunPowerApiSensorEntityDescription(
+            key=f"api_latency_{field}",
+            translation_key=f"api_latency_{field}",
+            icon="mdi:timer-outline",
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement="ms",
+            value_fn=lambda metrics, percent=percent: _milliseconds(metrics.latency(percent)),
+            endpoint_fn=_endpoint_latencies(f"latency_{field}"),
+        )
+        for field, percent in (("p50", 50), ("p95", 95))
+    ),
+    *(
+        SunPowerApiSensorEntityDescription(
+            key=f"api_{counter}",
+            translation_key=f"api_{counter}",
+            icon=icon,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            value_fn=lambda metrics, counter=counter: metrics.total(counter),
+            endpoint_fn=_endpoint_values(counter),
+        )
+        for counter, icon in (
+            ("errors", "mdi:alert-circle-outline"),
+            ("fallbacks", "mdi:database-clock-outline"),
+        )
+    ),
+    SunPowerApiSensorEntityDescription(
+        key="api_bytes_received",
+        translation_key="api_bytes_received",
+        icon="mdi:download-network-outline",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement="B",
+        value_fn=lambda metrics: metrics.total("bytes_received"),
+        endpoint_fn=_endpoint_values("bytes_received"),
+    ),
+)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up SunPower Maxeon system sensors."""
-    data = hass.data[DOMAIN][entry.entry_id]
-    periodic_coordinator: SunPowerPeriodicCoordinator = data["periodic"]
-    realtime_coordinator: SunPowerRealtimeCoordinator = data["realtime"]
-    full_coordinator: SunPowerFullCoordinator = data["full"]
-
-    entities = [
-        # Metadata / status
-        SunPowerSystemInfo(full_coordinator),
-
-        # Static system detail sensors
-        SunPowerDetailSensor(full_coordinator, "battery_capacity",  "kWh"),
-        SunPowerDetailSensor(full_coordinator, "installed_pv_power",  "kW"),
-        SunPowerDetailSensor(full_coordinator, "inverter_rated_power",  "kW"),
-        SunPowerDetailSensor(full_coordinator, "battery_usable_capacity",  "kWh"),
-        SunPowerDetailSensor(full_coordinator, "feedin_threshold",  "%"),
-
-        #Power Meter Sensors
-        SunPowerPowerSensor(realtime_coordinator, "p_pv",  "W"),
-        SunPowerPowerSensor(realtime_coordinator, "p_grid",  "W"),
-        SunPowerPowerSensor(realtime_coordinator, "p_storage",  "W"),
-        SunPowerPowerSensor(realtime_coordinator, "p_consumption",  "W"),
-        SunPowerPowerSensor(realtime_coordinator, "soc",  "%"),
-
-        #Energy Meter Sensors
-        SunPowerEnergySensor(periodic_coordinator, "e_pv_generation",  "kWh"),
-        SunPowerEnergySensor(periodic_coordinator, "e_storage_charge",  "kWh"),
-        SunPowerEnergySensor(periodic_coordinator, "e_storage_discharge", "kWh"),
-        SunPowerEnergySensor(periodic_coordinator, "e_grid_import", "kWh"),
-        SunPowerEnergySensor(periodic_coordinator, "e_grid_export",  "kWh"),
-        SunPowerEnergySensor(periodic_coordinator, "e_consumption",  "kWh"),
-
-        #Schedule Coordinator
-        ChargingScheduleSensor(periodic_coordinator),
-        DischargingScheduleSensor(periodic_coordinator),
-
-        #Config Sensors        
-        BatteryUPSBinarySensor(periodic_coordinator),
-        ExportLimitSensor(periodic_coordinator)
-
-    ]
-
-    async_add_entities(entities, True)
-
-class SunPowerEnergySensor(CoordinatorEntity[SunPowerPeriodicCoordinator], SensorEntity):
-    """Entity to expose specific SunPower system energy metrics."""
-
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    entities: list[SensorEntity] = []
+    for system in entry_data["systems"].values():
+        entities.extend(
+            SunPowerSensor(system[description.coordinator], description, system["device_info"])
+            for description in SENSORS
+        )
+        entities.extend(
+            SunPowerBinarySensor(system[description.coordinator], description, system["device_info"])
+            for description in BINARY_SENSORS
+        )
+
+    first_system = next(iter(entry_data["systems"].values()))
+    entities.extend(
+        SunPowerApiSensor(entry_data["api"].metrics, description, first_system["store"]["system_sn"], first_system["device_info"])
+        for description in API_SENSORS
+    )
+
+    async_add_entities(entities)
+
+
+class SunPowerEntity(CoordinatorEntity[SunPowerCoordinator]):
+    """Description-driven coordinator entity that only writes state changes."""
+
+    entity_description: SunPowerEntityDescription
     _attr_has_entity_name = True
+    _unrecorded_attributes = frozenset({"data_stale_since"})
+    _rendered: tuple | None = None
+    _written_state: tuple | None = None
 
     def __init__(
         self,
-        coordinator: SunPowerPeriodicCoordinator,
-        key: str,
-        unit: Optional[str] = "kWh",
+        coordinator: SunPowerCoordinator,
+        description: SunPowerEntityDescription,
+        device_info: DeviceInfo,
     ) -> None:
-        super().__init__(coordinator)
-        self._key = key
-        self._attr_unique_id = f"sm_energy_{key}"
-        self._attr_should_poll = False
-        self._attr_native_unit_of_measurement = unit
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
-
-    @property
-    def translation_key(self) -> str:
-        """Return a key for translation/localization."""
-        return self._key
-
-    @property
-    def native_value(self) -> Optional[float | int | str]:
+        # The data key is the listener context, so the coordinator only
+        # notifies the entity when the data under that key changed
+        super().__init__(coordinator, description.data_key)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.store['system_sn']}_{description.unique_id_suffix}"
+        # Shared by every entity of the system
+        self._attr_device_info = device_info
+        self._endpoint_name = ENDPOINT_NAMES[description.data_key]
+
+    @property
+    def _data(self) -> Any:
+        return self.coordinator.store[self.entity_description.data_key]
+
+    @property
+    def _has_data(self) -> bool:
+        """Return False while the key holds no fetched or saved data.
+
+        That is the empty default, or the built-in payload of an endpoint
+        that failed before ever answering; the restored state is shown
+        meanwhile.
+        """
+        data = self._data
+        key = self.entity_description.data_key
+        return data != SYSTEM_DATA_DEFAULTS[key] and not is_fallback(self._endpoint_name, data)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the description's attributes, and flag last known good data."""
+        attributes = {}
+        if (attributes_fn := self.entity_description.attributes_fn) is not None:
+            attributes.update(attributes_fn(self._data))
+        stale_since = self.coordinator.api.stale_since(self._endpoint_name, self.coordinator.store["system_sn"])
+        if stale_since is not None:
+            attributes["data_stale_since"] = stale_since.isoformat()
+        return attributes
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state unless it is the same as the last one written."""
+        # Nothing to render if the store version of the key, availability
+        # and staleness are the ones last rendered
+        store = self.coordinator.store
+        rendered = (
+            store.key_version(self.entity_description.data_key),
+            self.available,
+            self.coordinator.api.stale_since(self._endpoint_name, store["system_sn"]),
+        )
+        if rendered == self._rendered:
+            return
+        self._rendered = rendered
+
+        written_state = (self.available, self.state, self.extra_state_attributes, self.icon)
+        if written_state == self._written_state:
+            return
+        self._written_state = written_state
+        self.async_write_ha_state()
+
+
+class SunPowerSensor(SunPowerEntity, RestoreSensor):
+    """Sensor showing one value of a system's data."""
+
+    entity_description: SunPowerSensorEntityDescription
+    _restored_value: Any = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value to show until the first refresh completes."""
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_sensor_data()) is not None:
+            self._restored_value = last.native_value
+
+    @property
+    def native_value(self) -> Any:
         """Return the sensor's current value."""
-        return self.coordinator.data.get("energy", {}).get(self._key)
+        if not self._has_data:
+            return self._restored_value
+        return self.entity_description.value_fn(self._data)
 
     @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
+    def icon(self) -> str | None:
+        """Return the state-dependent icon, if the description has one."""
+        if (icon_fn := self.entity_description.icon_fn) is not None:
+            return icon_fn(self.native_value)
+        return self.entity_description.icon
 
-    @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
 
-    @property
-    def icon(self) -> str:
-        """Return an MDI icon based on the key."""
-        icon_map = {
-            "e_pv_generation": "mdi:solar-panel",
-            "e_storage_charge": "mdi:battery-arrow-up",
-            "e_storage_discharge": "mdi:battery-arrow-down",
-            "e_grid_import": "mdi:transmission-tower-export",
-            "e_grid_export": "mdi:transmission-tower-import",
-            "e_consumption": "mdi:home-lightning-bolt",
-        }
-        return icon_map.get(self._key, "mdi:gauge")
-    
-class SunPowerPowerSensor(CoordinatorEntity[SunPowerRealtimeCoordinator], SensorEntity):
-    """Sensor entity for real-time SunPower power readings and battery SoC."""
+class SunPowerBinarySensor(SunPowerEntity, BinarySensorEntity, RestoreEntity):
+    """Binary sensor showing one flag of a system's data."""
 
-    _attr_has_entity_name = True
+    entity_description: SunPowerBinarySensorEntityDescription
+    _restored_state: str | None = None
 
-    def __init__(
-        self,
-        coordinator: SunPowerRealtimeCoordinator,
-        key: str,
-        unit: Optional[str] = "W",
-    ) -> None:
-        super().__init__(coordinator)
-        self._key = key
-        self._attr_native_unit_of_measurement = unit
-        self._attr_unique_id = f"sm_power_{key}"
-        self._attr_should_poll = False
-
-        if key == "soc":
-            self._attr_device_class = SensorDeviceClass.BATTERY
-            self._attr_native_unit_of_measurement = "%"
-            self._attr_icon = "mdi:battery"
-        else:
-            self._attr_device_class = SensorDeviceClass.POWER
-            self._attr_native_unit_of_measurement = "W"
-
-        self._attr_state_class = SensorStateClass.MEASUREMENT
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state to show until the first refresh completes."""
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_state()) is not None:
+            self._restored_state = last.state
 
     @property
-    def translation_key(self) -> str:
-        """Return a key for translation/localization."""
-        return self._key
+    def is_on(self) -> bool | None:
+        """Return the flag."""
+        if not self._has_data:
+            return None if self._restored_state is None else self._restored_state == "on"
+        return self.entity_description.value_fn(self._data)
 
     @property
-    def native_value(self) -> Optional[float | int | str]:
-        """Return the sensor's current value."""
-        return self.coordinator.shared_data.get("power", {}).get(self._key)
+    def icon(self) -> str | None:
+        """Return the state-dependent icon, if the description has one."""
+        if (icon_fn := self.entity_description.icon_fn) is not None:
+            return icon_fn(self.is_on)
+        return self.entity_description.icon
 
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
 
-    @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
+class SunPowerApiSensor(SensorEntity):
+    """Disabled-by-default diagnostic sensor of the API client's metrics.
 
-    @property
-    def icon(self) -> str:
-        """Return an MDI icon based on the key."""
-        if self._key == "soc":
-            soc = self.native_value
-            if soc is None:
-                return "mdi:battery-unknown"
-            soc = max(0, min(100, int(soc)))
-            return f"mdi:battery-{soc // 10 * 10}" if soc < 100 else "mdi:battery"
-        icon_map = {
-            "p_pv": "mdi:solar-panel",
-            "p_consumption": "mdi:home-lightning-bolt",
-            "p_grid": "mdi:transmission-tower-export",
-            "p_storage": "mdi:battery",
-        }
-        return icon_map.get(self._key, "mdi:gauge")
-    
-class SunPowerDetailSensor(CoordinatorEntity[SunPowerFullCoordinator], SensorEntity):
-    """Entity to expose static SunPower system details."""
+    The metrics are in memory, so the sensor polls them instead of
+    listening to a coordinator.
+    """
 
+    entity_description: SunPowerApiSensorEntityDescription
     _attr_has_entity_name = True
-    _attr_should_poll = False
+    _attr_should_poll = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({"endpoints"})
 
     def __init__(
         self,
-        coordinator: SunPowerFullCoordinator,
-        key: str,
-        unit: Optional[str] = None,
+        metrics: ApiMetrics,
+        description: SunPowerApiSensorEntityDescription,
+        system_sn: str,
+        device_info: DeviceInfo,
     ) -> None:
-        super().__init__(coordinator)
-        self._key = key
-        self._attr_unique_id = f"sms_{key}"
-        self._attr_native_unit_of_measurement = unit
-
-        # Assign device class if applicable
-        if key in ["battery_capacity", "battery_usable_capacity"]:
-            self._attr_device_class = SensorDeviceClass.ENERGY
-        elif key in ["installed_pv_power", "inverter_rated_power"]:
-            self._attr_device_class = SensorDeviceClass.POWER
-
-    @property
-    def translation_key(self) -> str:
-        """Return the translation key to localize the entity name."""
-        return self._key
-
-    @property
-    def native_value(self) -> Optional[float | int | str]:
-        """Return the value for the specific system detail field."""
-        return self.coordinator.data.get("details", {}).get(self._key)
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
-
-    @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
-
-    @property
-    def icon(self) -> str:
-        """Return an appropriate icon for the sensor."""
-        if "battery" in self._key:
-            return "mdi:battery"
-        if "pv_power" in self._key or "inverter" in self._key:
-            return "mdi:solar-power"
-        return "mdi:gauge"
-
-class SunPowerSystemInfo(CoordinatorEntity[SunPowerFullCoordinator], SensorEntity):
-    """Entity to expose SunPower system status and metadata."""
-    _attr_has_entity_name = True
-    
-    def __init__(self, coordinator: SunPowerFullCoordinator) -> None:
-        super().__init__(coordinator)
-        
-        self._attr_unique_id = "sunpower_device_info"
-        self._attr_should_poll = False
-        self._attr_icon = "mdi:solar-power"
-
-    @property
-    def native_value(self) -> str:
-        """Return the system status as the main state."""
-        return self.coordinator.data.get("system", {}).get("status", "unknown")
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
-
-    @property
-    def device_info(self) -> dict:
-        """Return device metadata for the system."""
-        data = self.coordinator.data
-        return {
-            "identifiers": {(DOMAIN, data.get("system_sn", "unknown"))},
-            "name": "SunPower Maxeon System",
-            "manufacturer": "SunPower",
-            "model": data.get("details", {}).get("inverter_model", "Unknown"),
-            "sw_version": data.get("details", {}).get("inv_version"),
-        }
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Expose all API fields as attributes."""
-        return self.coordinator.shared_data
-    
-    @property
-    def translation_key(self) -> str:
-        """Return the translation key to localize the entity name."""
-        return "sunpower_maxeon_system"
-
-   
-class ChargingScheduleSensor(CoordinatorEntity[SunPowerPeriodicCoordinator], SensorEntity):
-    """Sensor for the SunPower charging schedule."""
-
-    _attr_has_entity_name = True
-    
-    _attr_unique_id = "sunpower_charging_schedule"
-    _attr_icon = "mdi:calendar-clock"  # Shows a calendar with clock icon
-
-    def __init__(self, coordinator: SunPowerPeriodicCoordinator) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-
-    @property
-    def state(self) -> str:
-        schedule = self.schedule
-        return "enabled" if schedule.get("enable") else "disabled"
-    
-    @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        schedule = self.schedule
-        return {
-            "start_time_1": schedule.get("start_time_1"),
-            "end_time_1": schedule.get("end_time_1"),
-            "start_time_2": schedule.get("start_time_2"),
-            "end_time_2": schedule.get("end_time_2"),
-            "max_soc": schedule.get("max_soc"),
-        }
-
-    @property
-    def schedule(self) -> dict:
-        return self.coordinator.data.get("charging_schedule", {})
-    
-    @property
-    def translation_key(self) -> str:
-        """Return the translation key to localize the entity name."""
-        return "charging_schedule"
-    
-class DischargingScheduleSensor(CoordinatorEntity[SunPowerPeriodicCoordinator], SensorEntity):
-    """Sensor for the SunPower discharging schedule."""
-
-    _attr_has_entity_name = True
-    
-    _attr_unique_id = "sunpower_discharging_schedule"
-    _attr_icon = "mdi:calendar-clock"  # Shows a calendar with clock icon
-
-    def __init__(self, coordinator: SunPowerPeriodicCoordinator) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-
-    @property
-    def state(self) -> str:
-        schedule = self.schedule
-        return "enabled" if schedule.get("enable") else "disabled"
-    
-    @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "name": f"SunPower System {system_sn}",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        schedule = self.schedule
-        return {
-            "start_time_1": schedule.get("start_time_1"),
-            "end_time_1": schedule.get("end_time_1"),
-            "start_time_2": schedule.get("start_time_2"),
-            "end_time_2": schedule.get("end_time_2"),
-            "min_soc": schedule.get("min_soc"),
-        }
-
-    @property
-    def schedule(self) -> dict:
-        return self.coordinator.data.get("discharging_schedule", {})
-    
-    @property
-    def translation_key(self) -> str:
-        """Return the translation key to localize the entity name."""
-        return "discharging_schedule"
-
-class BatteryUPSBinarySensor(CoordinatorEntity[SunPowerPeriodicCoordinator], BinarySensorEntity):
-    _attr_has_entity_name = True
-    
-    def __init__(self, coordinator: SunPowerPeriodicCoordinator):
-        super().__init__(coordinator)
-        
-        self._attr_unique_id = "sunpower_ups"
-        self._attr_device_class = SensorDeviceClass.POWER
-
-    @property
-    def is_on(self) -> bool:
-        """Return True if UPS is enabled."""
-        return self.coordinator.data.get("battery_ups", {}).get("enable", False)
-
-    @property
-    def icon(self) -> str:
-        """Return an icon based on UPS state."""
-        return "mdi:battery" if self.is_on else "mdi:battery-off"
-
-    @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "name": f"SunPower System {system_sn}",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
-    
-    @property
-    def translation_key(self) -> str:
-        """Return the translation key to localize the entity name."""
-        return "ups_enabled"
-
-class ExportLimitSensor(CoordinatorEntity[SunPowerPeriodicCoordinator], SensorEntity):
-    """Sensor for the export limit setting."""
-
-    _attr_has_entity_name = True
-    
-    _attr_unique_id = "sunpower_export_limit"
-    _attr_icon = "mdi:transmission-tower-export"
-
-    def __init__(self, coordinator: SunPowerPeriodicCoordinator) -> None:
-        super().__init__(coordinator)
-
-    @property
-    def state(self) -> str:
-        return "enabled" if self.coordinator.data.get("export_limit", {}).get("enable") else "disabled"
-
-    @property
-    def extra_state_attributes(self) -> dict:
-        return self.coordinator.data.get("export_limit", {})
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_unique_id = f"{system_sn}_{description.key}"
+        self._attr_device_info = device_info
 
     @property
-    def device_info(self) -> dict:
-        """Return device info for the system."""
-        system_sn = self.coordinator.shared_data.get("system_sn", "unknown")
-        return {
-            "identifiers": {(DOMAIN, system_sn)},
-            "manufacturer": "SunPower",
-            "name": f"SunPower System {system_sn}",
-            "model": self.coordinator.shared_data.get("inverter_model", "Unknown"),
-            "sw_version": self.coordinator.shared_data.get("inv_version"),
-        }
+    def native_value(self) -> Any:
+        """Return the metric over every endpoint."""
+        return self.entity_description.value_fn(self._metrics)
 
     @property
-    def translation_key(self) -> str:
-        """Return the translation key to localize the entity name."""
-        return "feedin_threshold"
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the metric of each endpoint."""
+        return {"endpoints": self.entity_description.endpoint_fn(self._metrics)}
@@ -0,0 +1,5 @@
+"""Local stand-in for the SunPower Maxeon API, for offline testing."""
+
+from .server import Faults, MaxeonSimulator
+
+__all__ = ["Faults", "MaxeonSimulator"]
@@ -0,0 +1,61 @@
+"""Run the simulator until interrupted.
+
+    python -m simulator --systems 200 --port 8765 --latency 0.3 --rate-limited 0.02
+
+Home Assistant uses it when started with SUNPOWER_MAXEON_API_URL set to
+the printed URL; the OAuth endpoints are served from the same URL.
+"""
+
+import argparse
+import asyncio
+
+from .server import Faults, MaxeonSimulator
+from .systems import DEFAULT_SAMPLE_INTERVAL
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limited=args.rate_limited,
+        retry_after=args.retry_after,
+        server_errors=args.server_errors,
+        timeouts=args.timeouts,
+    )
+    simulator = MaxeonSimulator(args.systems, faults, args.speed, args.token_lifetime, args.seed, args.sample_interval)
+    url = await simulator.start(args.host, args.port)
+    print(f"Serving {args.systems} systems; start Home Assistant with")
+    print(f"  SUNPOWER_MAXEON_API_URL={url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+        print(f"Requests: {dict(simulator.requests)}")
+        print(f"Faults injected: {dict(simulator.faults_injected)}")
+        print(f"Bytes sent: {simulator.bytes_sent}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m simulator", description="Serve the SunPower Maxeon API locally.")
+    parser.add_argument("--systems", type=int, default=1, help="number of simulated systems")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="simulated time per wall-clock second, e.g. 60 for a day in 24 minutes")
+    parser.add_argument("--sample-interval", type=int, default=DEFAULT_SAMPLE_INTERVAL, help="seconds between two samples of the meters")
+    parser.add_argument("--seed", type=int, help="seed for reproducible systems and faults")
+    parser.add_argument("--token-lifetime", type=int, default=3600, help="access token lifetime in seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean added latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="standard deviation of the added latency")
+    parser.add_argument("--rate-limited", type=float, default=0.0, help="probability of HTTP 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with HTTP 429")
+    parser.add_argument("--server-errors", type=float, default=0.0, help="probability of HTTP 5xx")
+    parser.add_argument("--timeouts", type=float, default=0.0, help="probability of never answering")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
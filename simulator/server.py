@@ -0,0 +1,228 @@
+"""HTTP server implementing the Maxeon API endpoints used by api.py."""
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+import random
+import secrets
+import time
+
+from aiohttp import web
+from yarl import URL
+
+from .systems import DEFAULT_SAMPLE_INTERVAL, DEFAULT_SETTINGS, SimulatedClock, SimulatedSystem
+
+_OAUTH_ROUTES = ("authorize", "token")
+
+
+@dataclass
+class Faults:
+    """Faults injected into API responses; may be changed while serving.
+
+    Rates are probabilities per request. A timed out request is held for
+    `hang` seconds, longer than the integration waits.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limited: float = 0.0
+    retry_after: int = 1
+    server_errors: float = 0.0
+    timeouts: float = 0.0
+    hang: float = 120.0
+
+
+class MaxeonSimulator:
+    """Serve the Maxeon API and its OAuth endpoints for simulated systems.
+
+    API requests need a bearer token issued by the token endpoint or by
+    `issue_token`. The authorize endpoint approves every request at once.
+
+    Every request is counted by route name, e.g. "GET power_meter", in
+    `requests`, and every injected fault by kind in `faults_injected`.
+
+    The meters are sampled every `sample_interval` seconds. Settings are
+    sent with ETag and Last-Modified, and conditional GETs of unchanged
+    settings are answered with 304 Not Modified.
+    """
+
+    def __init__(
+        self,
+        systems: int = 1,
+        faults: Faults | None = None,
+        speed: float = 1.0,
+        token_lifetime: int = 3600,
+        seed: int | None = None,
+        sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        self.faults = faults or Faults()
+        self.token_lifetime = token_lifetime
+        self._rng = random.Random(seed)
+        clock = SimulatedClock(speed)
+        self.systems = {
+            system_sn: SimulatedSystem(system_sn, clock, random.Random(self._rng.random()), sample_interval)
+            for system_sn in (f"SIM{index:06d}" for index in range(systems))
+        }
+        self.system_sns = list(self.systems)
+        self.requests: Counter[str] = Counter()
+        self.faults_injected: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self._codes: set[str] = set()
+        self._access_tokens: dict[str, float] = {}
+        self._refresh_tokens: set[str] = set()
+        self._runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the API base URL."""
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/v1"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def issue_token(self, lifetime: int | None = None) -> dict:
+        """Return a new token response, as the token endpoint would."""
+        lifetime = self.token_lifetime if lifetime is None else lifetime
+        access_token = secrets.token_urlsafe(24)
+        refresh_token = secrets.token_urlsafe(24)
+        self._access_tokens[access_token] = time.time() + lifetime
+        self._refresh_tokens.add(refresh_token)
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "Bearer",
+            "expires_in": lifetime,
+        }
+
+    def _app(self) -> web.Application:
+        app = web.Application(middlewares=[self._count, self._inject_faults, self._authenticate])
+        app.router.add_get("/v1/authorize", self._authorize, name="authorize")
+        app.router.add_post("/v1/token", self._token, name="token")
+        system = "/v1/systems/{system_sn}"
+        app.router.add_get("/v1/systems", self._systems, name="systems")
+        app.router.add_get(system, self._details, name="details")
+        app.router.add_get(f"{system}/power_meter", self._power_meter, name="power_meter")
+        app.router.add_get(f"{system}/energy_meter", self._energy_meter, name="energy_meter")
+        for name in DEFAULT_SETTINGS:
+            app.router.add_route("*", f"{system}/{name}", self._setting, name=name)
+        return app
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests[f"{request.method} {request.match_info.route.name}"] += 1
+        response = await handler(request)
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_sent += len(response.body)
+        return response
+
+    @web.middleware
+    async def _inject_faults(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.match_info.route.name in _OAUTH_ROUTES:
+            return await handler(request)
+        faults = self.faults
+        if faults.latency or faults.jitter:
+            await asyncio.sleep(max(self._rng.gauss(faults.latency, faults.jitter), 0))
+        draw = self._rng.random()
+        if draw < faults.timeouts:
+            self.faults_injected["timeout"] += 1
+            await asyncio.sleep(faults.hang)
+            raise web.HTTPGatewayTimeout()
+        draw -= faults.timeouts
+        if draw < faults.rate_limited:
+            self.faults_injected["rate_limited"] += 1
+            raise web.HTTPTooManyRequests(headers={"Retry-After": str(faults.retry_after)})
+        draw -= faults.rate_limited
+        if draw < faults.server_errors:
+            self.faults_injected["server_error"] += 1
+            raise self._rng.choice((web.HTTPInternalServerError, web.HTTPBadGateway, web.HTTPServiceUnavailable))()
+        return await handler(request)
+
+    @web.middleware
+    async def _authenticate(self, request: web.Request, handler) -> web.StreamResponse:
+        if request.match_info.route.name in _OAUTH_ROUTES:
+            return await handler(request)
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme != "Bearer" or self._access_tokens.get(token, 0) < time.time():
+            raise web.HTTPUnauthorized(headers={"WWW-Authenticate": 'Bearer error="invalid_token"'})
+        return await handler(request)
+
+    async def _authorize(self, request: web.Request) -> web.Response:
+        if (redirect_uri := request.query.get("redirect_uri")) is None:
+            raise web.HTTPBadRequest(text="missing redirect_uri")
+        code = secrets.token_urlsafe(16)
+        self._codes.add(code)
+        location = URL(redirect_uri).update_query(code=code, state=request.query.get("state", ""))
+        raise web.HTTPFound(location)
+
+    async def _token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        grant_type = form.get("grant_type")
+        if grant_type == "authorization_code" and form.get("code") in self._codes:
+            self._codes.discard(form["code"])
+        elif grant_type == "refresh_token" and form.get("refresh_token") in self._refresh_tokens:
+            self._refresh_tokens.discard(form["refresh_token"])
+        else:
+            return web.json_response({"error": "invalid_grant"}, status=400)
+        return web.json_response(self.issue_token())
+
+    def _system(self, request: web.Request) -> SimulatedSystem:
+        if (system := self.systems.get(request.match_info["system_sn"])) is None:
+            raise web.HTTPNotFound()
+        return system
+
+    async def _systems(self, request: web.Request) -> web.Response:
+        return web.json_response({"systems": [system.details() for system in self.systems.values()]})
+
+    async def _details(self, request: web.Request) -> web.Response:
+        return web.json_response(self._system(request).details())
+
+    async def _power_meter(self, request: web.Request) -> web.Response:
+        return web.json_response(self._system(request).power_meter())
+
+    async def _energy_meter(self, request: web.Request) -> web.Response:
+        return web.json_response(self._system(request).energy_meter())
+
+    async def _setting(self, request: web.Request) -> web.Response:
+        system = self._system(request)
+        name = request.match_info.route.name
+        if request.method == "PUT":
+            payload = await request.json()
+            if not isinstance(payload, dict):
+                raise web.HTTPBadRequest(text="expected a JSON object")
+            system.write_setting(name, payload)
+            return web.json_response({})
+        if request.method != "GET":
+            raise web.HTTPMethodNotAllowed(request.method, ["GET", "PUT"])
+
+        headers = {
+            "ETag": f'"{system.system_sn}-{name}-{system.settings_versions[name]}"',
+            "Last-Modified": formatdate(system.settings_modified_at[name], usegmt=True),
+        }
+        if _not_modified(request, headers["ETag"], system.settings_modified_at[name]):
+            return web.Response(status=304, headers=headers)
+        return web.json_response(system.settings[name], headers=headers)
+
+
+def _not_modified(request: web.Request, etag: str, modified_at: int) -> bool:
+    """Return True when the request's validators match the current ones.
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+    """
+    if (if_none_match := request.headers.get("If-None-Match")) is not None:
+        return etag in (tag.strip() for tag in if_none_match.split(","))
+    if (if_modified_since := request.headers.get("If-Modified-Since")) is not None:
+        try:
+            return modified_at <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
@@ -0,0 +1,211 @@
+"""Simulated systems whose power follows the time of day."""
+
+from copy import deepcopy
+import math
+import random
+import time
+
+# Settings every simulated system starts with
+DEFAULT_SETTINGS = {
+    "battery_ups": {"enable": True},
+    "charging_schedule": {
+        "enable": False,
+        "start_time_1": "01:00",
+        "end_time_1": "05:00",
+        "start_time_2": "13:00",
+        "end_time_2": "15:00",
+        "max_soc": 95,
+    },
+    "discharging_schedule": {
+        "enable": False,
+        "start_time_1": "18:00",
+        "end_time_1": "22:00",
+        "start_time_2": "06:00",
+        "end_time_2": "08:00",
+        "min_soc": 20,
+    },
+    "export_limit": {"enable": True, "export_rate": 80},
+}
+
+# Seconds between two samples of the power and energy meters
+DEFAULT_SAMPLE_INTERVAL = 30
+
+# Longest step, in simulated seconds, the energy counters are integrated over
+_STEP = 60.0
+
+# Simulated time skipped over instead of integrated after a long pause
+_MAX_CATCH_UP = 86400.0
+
+_MAX_BATTERY_POWER = 5000.0
+
+
+class SimulatedClock:
+    """Wall clock running `speed` times faster from when it was created."""
+
+    def __init__(self, speed: float = 1.0) -> None:
+        self.speed = speed
+        self._started_at = time.time()
+
+    def now(self) -> float:
+        return self._started_at + (time.time() - self._started_at) * self.speed
+
+
+class SimulatedSystem:
+    """A PV system with a battery, at a random size and household load.
+
+    PV follows a half sine between 06:00 and 18:00 local simulated time,
+    shaded by drifting clouds; consumption has morning and evening peaks.
+    The battery absorbs the surplus and covers the deficit within its SoC
+    limits, and the grid balances the rest. Powers are in W, positive for
+    PV production, grid import and battery discharge; energy counters are
+    in kWh and only grow.
+
+    Like the real backend, the meters are sampled every `sample_interval`
+    wall-clock seconds: every request within one period returns the same
+    sample, stamped with the start of the period. Every setting has a
+    version and a modification time, changed by `write_setting`.
+    """
+
+    def __init__(
+        self,
+        system_sn: str,
+        clock: SimulatedClock,
+        rng: random.Random,
+        sample_interval: int = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        self.system_sn = system_sn
+        self.sample_interval = sample_interval
+        self.settings = deepcopy(DEFAULT_SETTINGS)
+        self.settings_versions = dict.fromkeys(DEFAULT_SETTINGS, 1)
+        self.settings_modified_at = dict.fromkeys(DEFAULT_SETTINGS, int(time.time()))
+        self._samples: dict[str, dict] = {}
+        self._clock = clock
+        self._rng = rng
+        self.installed_pv_power = round(rng.uniform(3.0, 10.0), 1)
+        self.inverter_rated_power = 5 if self.installed_pv_power <= 6 else 8
+        self.battery_usable_capacity = 9.752
+        self._base_load = rng.uniform(150, 450)
+        self._load_scale = rng.uniform(0.6, 1.6)
+        self._clouds = rng.uniform(0.7, 1.0)
+        self.soc = rng.uniform(20, 80)
+        self.energy = dict.fromkeys(
+            (
+                "e_pv_generation",
+                "e_storage_charge",
+                "e_storage_discharge",
+                "e_grid_import",
+                "e_grid_export",
+                "e_consumption",
+            ),
+            0.0,
+        )
+        self._updated_at = clock.now()
+        self.power = self._power(self._updated_at)
+
+    def details(self) -> dict:
+        return {
+            "system_sn": self.system_sn,
+            "active_at": 1718612017,
+            "installed_pv_power": self.installed_pv_power,
+            "inverter_model": f"RESERVE-INV-1-P{self.inverter_rated_power}-L1-INT",
+            "inverter_rated_power": self.inverter_rated_power,
+            "battery_model": "RESERVE-BAT-1-DC-10.1-INT",
+            "battery_capacity": 10.08,
+            "battery_usable_capacity": self.battery_usable_capacity,
+            "meter_type": "CT",
+            "feedin_threshold": 90,
+            "inv_version": "01000.165",
+            "ems_version": "V0.11.04",
+            "bms_version": "V1.53",
+            "status": "Normal",
+        }
+
+    def power_meter(self) -> dict:
+        return self._sample(
+            "power_meter",
+            lambda: {
+                **{key: round(value) for key, value in self.power.items()},
+                "soc": round(self.soc, 1),
+            },
+        )
+
+    def energy_meter(self) -> dict:
+        return self._sample(
+            "energy_meter",
+            lambda: {
+                **{key: round(value, 3) for key, value in self.energy.items()},
+                "p_max_charge": _MAX_BATTERY_POWER,
+                "p_max_discharge": _MAX_BATTERY_POWER,
+            },
+        )
+
+    def write_setting(self, name: str, payload: dict) -> None:
+        self.settings[name] = {**self.settings[name], **payload}
+        self.settings_versions[name] += 1
+        self.settings_modified_at[name] = int(time.time())
+
+    def _sample(self, meter: str, values) -> dict:
+        """Return the meter's sample of the current period, taking it if new."""
+        timestamp = int(time.time()) // self.sample_interval * self.sample_interval
+        sample = self._samples.get(meter)
+        if sample is None or sample["timestamp"] != timestamp:
+            self._advance()
+            sample = self._samples[meter] = {"system_sn": self.system_sn, "timestamp": timestamp, **values()}
+        return sample
+
+    def _advance(self) -> None:
+        """Integrate the energy counters and SoC up to the simulated now."""
+        now = self._clock.now()
+        at = max(self._updated_at, now - _MAX_CATCH_UP)
+        while at < now:
+            step = min(_STEP, now - at)
+            self._integrate(self.power, step)
+            at += step
+            self.power = self._power(at)
+        self._updated_at = now
+
+    def _integrate(self, power: dict[str, float], seconds: float) -> None:
+        kwh = seconds / 3.6e6
+        self.energy["e_pv_generation"] += power["p_pv"] * kwh
+        self.energy["e_consumption"] += power["p_consumption"] * kwh
+        self.energy["e_grid_import"] += max(power["p_grid"], 0) * kwh
+        self.energy["e_grid_export"] += max(-power["p_grid"], 0) * kwh
+        self.energy["e_storage_discharge"] += max(power["p_storage"], 0) * kwh
+        self.energy["e_storage_charge"] += max(-power["p_storage"], 0) * kwh
+        self.soc -= power["p_storage"] * kwh / self.battery_usable_capacity * 100
+        self.soc = min(max(self.soc, 0.0), 100.0)
+
+    def _power(self, at: float) -> dict[str, float]:
+        local = time.localtime(at)
+        hour = local.tm_hour + local.tm_min / 60 + local.tm_sec / 3600
+
+        self._clouds = min(max(self._clouds + self._rng.gauss(0, 0.03), 0.2), 1.0)
+        sun = max(math.sin(math.pi * (hour - 6) / 12), 0.0)
+        pv = self.installed_pv_power * 1000 * 0.85 * sun * self._clouds
+
+        peaks = 1200 * math.exp(-(((hour - 7.5) / 1.0) ** 2)) + 2200 * math.exp(-(((hour - 19.0) / 1.5) ** 2))
+        consumption = self._base_load + self._load_scale * peaks + self._rng.uniform(-80, 80)
+        consumption = max(consumption, 50.0)
+
+        charging = self.settings["charging_schedule"]
+        discharging = self.settings["discharging_schedule"]
+        max_soc = charging["max_soc"] if charging["enable"] else 100
+        min_soc = discharging["min_soc"] if discharging["enable"] else 10
+        surplus = pv - consumption
+        if surplus > 0 and self.soc < max_soc:
+            storage = -min(surplus, _MAX_BATTERY_POWER)
+        elif surplus < 0 and self.soc > min_soc:
+            storage = min(-surplus, _MAX_BATTERY_POWER)
+        else:
+            storage = 0.0
+
+        grid = consumption - pv - storage
+        export_limit = self.settings["export_limit"]
+        if export_limit["enable"]:
+            # Curtail the PV instead of exporting above the limit
+            max_export = self.inverter_rated_power * 1000 * export_limit["export_rate"] / 100
+            if -grid > max_export:
+                pv -= -grid - max_export
+                grid = -max_export
+
+        return {"p_pv": pv, "p_grid": grid, "p_storage": storage, "p_consumption": consumption}
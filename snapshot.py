@@ -0,0 +1,59 @@
+"""Persisted data snapshot for the SunPower Maxeon integration."""
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_VERSION
+from .models import dump_system_data
+from .store import SystemStore
+
+
+class SunPowerSnapshot:
+    """Keep the latest per-system data on disk so setup can start from it.
+
+    Saves are throttled: at most one write is pending at a time, and it
+    happens SNAPSHOT_SAVE_DELAY after the first change since the last write.
+    `async_flush` writes it at once, so unloading never leaves a timer that
+    writes after the entry was reloaded or removed.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict] = Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._systems: dict[str, SystemStore] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> dict[str, dict]:
+        """Return the saved data keyed by system serial, empty if there is none.
+
+        The data is as saved; models.load_system_data parses it.
+        """
+        data = await self._store.async_load()
+        return (data or {}).get("systems", {})
+
+    @callback
+    def async_track(self, system_sn: str, store: SystemStore) -> None:
+        """Include a system's data in future saves."""
+        self._systems[system_sn] = store
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the tracked data soon, unless a save is already pending."""
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._save_pending = False
+        return {"systems": {sn: dump_system_data(store.snapshot) for sn, store in self._systems.items()}}
+
+    async def async_flush(self) -> None:
+        """Write a pending save now, cancelling its timer."""
+        if self._save_pending:
+            # async_save cancels the delayed write scheduled on the same Store
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the saved snapshot."""
+        await self._store.async_remove()
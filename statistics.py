@@ -0,0 +1,141 @@
+"""Long-term statistics compiled from the realtime power samples."""
+
+from datetime import datetime
+import logging
+import math
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, ENERGY_POWER_SOURCES, STATISTICS_COMPILE_MINUTE
+from .samples import PowerSampleBuffer
+
+_LOGGER = logging.getLogger(__name__)
+
+_HOUR = 3600
+
+# Sample fields with an hourly mean/min/max, and their units
+_MEAN_FIELDS = {
+    "p_pv": "W",
+    "p_grid": "W",
+    "p_storage": "W",
+    "p_consumption": "W",
+    "soc": "%",
+}
+
+
+class SunPowerStatistics:
+    """Import hourly statistics of one system's power samples into the recorder.
+
+    Shortly after every hour, the mean/min/max of each power field and the
+    energy flowing in each counter's direction are computed from the sample
+    buffer for every complete hour not pushed yet, and imported as external
+    statistics in one batch per statistic.
+    """
+
+    def __init__(self, hass: HomeAssistant, system_sn: str, samples: PowerSampleBuffer) -> None:
+        self.hass = hass
+        self._system_sn = system_sn
+        self._samples = samples
+        # Start of the last hour pushed, and the running energy sums
+        self._last_hour: float | None = None
+        self._sums: dict[str, float] | None = None
+
+    def _statistic_id(self, key: str) -> str:
+        return f"{DOMAIN}:{slugify(self._system_sn)}_{key}"
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Compile every hour; return the function that stops it."""
+        return async_track_time_change(
+            self.hass, self._async_compile, minute=STATISTICS_COMPILE_MINUTE, second=0
+        )
+
+    async def _async_load_sums(self) -> dict[str, float]:
+        """Continue the energy sums, and hours, from the last imported statistics."""
+        sums = {}
+        for key in ENERGY_POWER_SOURCES:
+            statistic_id = self._statistic_id(key)
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+            )
+            if rows := last.get(statistic_id):
+                sums[key] = rows[0]["sum"] or 0.0
+                self._last_hour = max(self._last_hour or 0.0, rows[0]["start"])
+            else:
+                sums[key] = 0.0
+        return sums
+
+    async def _async_compile(self, now: datetime) -> None:
+        """Push the statistics of the complete hours not pushed yet."""
+        if not len(self._samples):
+            return
+        if self._sums is None:
+            self._sums = await self._async_load_sums()
+
+        hours = self._samples.complete_hours(dt_util.as_timestamp(now), self._last_hour)
+        if not hours:
+            return
+
+        for field, unit in _MEAN_FIELDS.items():
+            statistics = [
+                stats
+                for hour in hours
+                if (stats := self._mean_statistics(field, hour)) is not None
+            ]
+            if statistics:
+                self._add(field, unit, statistics, has_mean=True)
+
+        for key, (field, sign) in ENERGY_POWER_SOURCES.items():
+            statistics = []
+            for hour in hours:
+                self._sums[key] += self._samples.energy(field, sign, hour, hour + _HOUR)
+                statistics.append(
+                    StatisticData(
+                        start=dt_util.utc_from_timestamp(hour),
+                        state=self._sums[key],
+                        sum=self._sums[key],
+                    )
+                )
+            self._add(key, "kWh", statistics, has_sum=True)
+
+        self._last_hour = hours[-1]
+        _LOGGER.debug("%s: imported statistics for %d hour(s)", self._system_sn, len(hours))
+
+    def _mean_statistics(self, field: str, hour: float) -> StatisticData | None:
+        """Return the mean/min/max of `field` over the hour, None without samples."""
+        values = [v for v in self._samples.values(field, hour, hour + _HOUR) if not math.isnan(v)]
+        if not values:
+            return None
+        return StatisticData(
+            start=dt_util.utc_from_timestamp(hour),
+            mean=sum(values) / len(values),
+            min=min(values),
+            max=max(values),
+        )
+
+    @callback
+    def _add(
+        self,
+        key: str,
+        unit: str,
+        statistics: list[StatisticData],
+        has_mean: bool = False,
+        has_sum: bool = False,
+    ) -> None:
+        metadata = StatisticMetaData(
+            source=DOMAIN,
+            statistic_id=self._statistic_id(key),
+            name=f"{self._system_sn} {key}",
+            unit_of_measurement=unit,
+            has_mean=has_mean,
+            has_sum=has_sum,
+        )
+        async_add_external_statistics(self.hass, metadata, statistics)
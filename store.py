@@ -0,0 +1,61 @@
+"""Per-system data store for the SunPower Maxeon integration."""
+
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+from typing import Any
+
+_MISSING = object()
+
+
+class SystemStore(Mapping[str, Any]):
+    """Versioned, immutable snapshots of one system's data.
+
+    Reading goes to the current snapshot without copying. `update` never
+    mutates a snapshot: it publishes a new one that shares every unchanged
+    value with the previous one, and records the version in which each key
+    last changed. Stored values are treated as immutable too.
+    """
+
+    __slots__ = ("_snapshot", "_version", "_versions")
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        self._snapshot: Mapping[str, Any] = MappingProxyType(dict(data))
+        self._version = 0
+        self._versions: dict[str, int] = {}
+
+    @property
+    def snapshot(self) -> Mapping[str, Any]:
+        """Return the current read-only snapshot."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Return the version of the current snapshot."""
+        return self._version
+
+    def key_version(self, key: str) -> int:
+        """Return the version in which `key` last changed."""
+        return self._versions.get(key, 0)
+
+    def update(self, changes: Mapping[str, Any]) -> bool:
+        """Publish a snapshot with `changes` applied; return False if nothing changed."""
+        changed = [key for key, value in changes.items() if self._snapshot.get(key, _MISSING) != value]
+        if not changed:
+            return False
+
+        self._version += 1
+        data = dict(self._snapshot)
+        for key in changed:
+            data[key] = changes[key]
+            self._versions[key] = self._version
+        self._snapshot = MappingProxyType(data)
+        return True
+
+    def __getitem__(self, key: str) -> Any:
+        return self._snapshot[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
@@ -0,0 +1,16 @@
+"""Make the integration's pure modules importable without Home Assistant."""
+
+from pathlib import Path
+import sys
+import types
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Register the repository root as the `sunpower_maxeon` package without
+# running its __init__, which needs Home Assistant. pytest also imports
+# the root __init__ under the directory's name when setting up the tests,
+# so the same module stands in for it there.
+_package = types.ModuleType("sunpower_maxeon")
+_package.__path__ = [str(ROOT)]
+for _name in ("sunpower_maxeon", ROOT.name):
+    sys.modules.setdefault(_name, _package)
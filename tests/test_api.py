@@ -0,0 +1,80 @@
+"""Tests of the API client's response cache."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("homeassistant")
+
+from sunpower_maxeon.api import AsyncConfigEntryAuth  # noqa: E402
+from sunpower_maxeon.models import ExportLimit  # noqa: E402
+from sunpower_maxeon.rate_limiter import RateLimiter  # noqa: E402
+
+
+class _OAuthSession:
+    valid_token = True
+    token = {"access_token": "token"}
+
+
+class _Response:
+    def __init__(self, body: dict) -> None:
+        self.status = 200
+        self.headers = {}
+        self._body = body
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return b"{}"
+
+    async def json(self) -> dict:
+        return self._body
+
+
+class _Server:
+    """Serve one export limit setting; GETs can be held after reading it."""
+
+    def __init__(self) -> None:
+        self.setting = {"enable": True, "export_rate": 80}
+        self.gets = 0
+        self.hold = asyncio.Event()
+        self.hold.set()
+        self.read = asyncio.Event()
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, json: dict | None = None, **kwargs):
+        if method == "PUT":
+            self.setting = {**self.setting, **json}
+            yield _Response({})
+            return
+        self.gets += 1
+        body = dict(self.setting)
+        self.read.set()
+        await self.hold.wait()
+        yield _Response(body)
+
+
+def test_get_overtaken_by_a_write_is_not_cached():
+    async def _run() -> tuple[ExportLimit, ExportLimit, int]:
+        server = _Server()
+        api = AsyncConfigEntryAuth(server, _OAuthSession(), RateLimiter(1000, 10))
+
+        # The GET reads the setting, then a write lands before it returns
+        server.hold.clear()
+        get = asyncio.create_task(api.async_get_export_limit("A"))
+        await server.read.wait()
+        assert await api.async_set_export_limit("A", 50)
+        server.hold.set()
+        read = await get
+
+        return read, await api.async_get_export_limit("A"), server.gets
+
+    read, cached, gets = asyncio.run(_run())
+
+    assert read == ExportLimit(enable=True, export_rate=50)
+    assert cached == ExportLimit(enable=True, export_rate=50)
+    # The overtaken GET was sent again; the later one is a cache hit
+    assert gets == 2
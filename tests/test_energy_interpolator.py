@@ -0,0 +1,46 @@
+"""Tests of the energy estimates between energy_meter readings."""
+
+from sunpower_maxeon.models import EnergyMeter, PowerMeter
+from sunpower_maxeon.samples import EnergyInterpolator, PowerSampleBuffer
+
+
+def _buffer(capacity: int, *samples: tuple[int, float]) -> PowerSampleBuffer:
+    buffer = PowerSampleBuffer(capacity)
+    for timestamp, p_pv in samples:
+        buffer.append(PowerMeter(timestamp=timestamp, p_pv=p_pv))
+    return buffer
+
+
+def test_interpolator_adds_power_since_reading():
+    buffer = _buffer(10, (1000, 3600.0), (1600, 3600.0))
+    interpolator = EnergyInterpolator(buffer)
+
+    assert interpolator.update(EnergyMeter(timestamp=1000, e_pv_generation=10.0)) == {"e_pv_generation": 10.6}
+
+
+def test_interpolator_holds_until_caught_up():
+    buffer = _buffer(10, (1000, 3600.0), (1600, 3600.0))
+    interpolator = EnergyInterpolator(buffer)
+    interpolator.update(EnergyMeter(timestamp=1000, e_pv_generation=10.0))
+
+    # A reading below the estimate already reported does not go back
+    reading = EnergyMeter(timestamp=1600, e_pv_generation=10.5)
+    assert interpolator.update(reading) == {"e_pv_generation": 10.6}
+    buffer.append(PowerMeter(timestamp=1700, p_pv=3600.0))
+    assert interpolator.update(reading) == {"e_pv_generation": 10.6}
+    buffer.append(PowerMeter(timestamp=1800, p_pv=3600.0))
+    assert interpolator.update(reading) == {"e_pv_generation": 10.7}
+
+
+def test_interpolator_follows_meter_reset():
+    buffer = _buffer(10, (1000, 3600.0), (1600, 3600.0))
+    interpolator = EnergyInterpolator(buffer)
+    interpolator.update(EnergyMeter(timestamp=1000, e_pv_generation=10.0))
+
+    assert interpolator.update(EnergyMeter(timestamp=1900, e_pv_generation=0.2)) == {"e_pv_generation": 0.2}
+
+
+def test_interpolator_restores_values():
+    interpolator = EnergyInterpolator(PowerSampleBuffer(10), {"e_pv_generation": 12.0})
+
+    assert interpolator.update(EnergyMeter(timestamp=1000, e_pv_generation=11.0)) == {"e_pv_generation": 12.0}
@@ -0,0 +1,79 @@
+"""Tests of the API request metrics."""
+
+import asyncio
+
+import pytest
+
+from sunpower_maxeon.metrics import ApiMetrics, _percentile
+
+KEY = "GET power_meter"
+URL = "https://api.example/v1/systems/A/power_meter"
+
+
+def test_measure_counts_and_traces_requests():
+    metrics = ApiMetrics()
+
+    with metrics.measure(KEY, URL) as record:
+        record.status = 200
+        record.bytes = 120
+
+    endpoint = metrics.endpoint(KEY)
+    assert (endpoint.requests, endpoint.errors, endpoint.bytes_received) == (1, 0, 120)
+    assert len(endpoint.latencies) == 1
+    assert metrics.requests_last_hour == 1
+    assert [(record.source, record.status) for record in metrics.trace] == [("api", 200)]
+
+
+class _HttpError(Exception):
+    status = 503
+
+
+@pytest.mark.parametrize(
+    ("error", "status"),
+    [(_HttpError(), 503), (TimeoutError(), "TimeoutError")],
+)
+def test_measure_counts_errors(error, status):
+    metrics = ApiMetrics()
+
+    with pytest.raises(type(error)), metrics.measure(KEY, URL):
+        raise error
+
+    assert metrics.endpoint(KEY).errors == 1
+    assert metrics.trace[-1].status == status
+
+
+def test_cancelled_request_is_not_an_error():
+    metrics = ApiMetrics()
+
+    with pytest.raises(asyncio.CancelledError), metrics.measure(KEY, URL):
+        raise asyncio.CancelledError
+
+    assert metrics.endpoint(KEY).errors == 0
+    assert metrics.trace[-1].status == "cancelled"
+
+
+def test_answers_without_request_are_counted_apart():
+    metrics = ApiMetrics()
+
+    metrics.record_cache_hit(KEY, URL)
+    metrics.record_coalesced(KEY, URL)
+    metrics.record_fallback(KEY, URL, stale=True)
+    metrics.record_fallback("GET energy_meter", URL, stale=False)
+
+    assert metrics.total("requests") == 0
+    assert metrics.total("fallbacks") == 2
+    assert metrics.as_dict()[KEY]["cache_hits"] == 1
+    assert metrics.as_dict()[KEY]["coalesced"] == 1
+    assert [record.source for record in metrics.trace] == ["cache", "coalesced", "fallback", "default"]
+    assert metrics.requests_last_hour == 0
+
+
+def test_latency_percentiles():
+    metrics = ApiMetrics()
+    metrics.endpoint(KEY).latencies.extend([0.1, 0.2, 0.3, 0.4])
+    metrics.endpoint("GET energy_meter").latencies.append(1.0)
+
+    assert metrics.latency(50) == 0.3
+    assert metrics.latency(95) == 1.0
+    assert metrics.as_dict()[KEY]["latency_p50"] == 0.2
+    assert _percentile([], 50) is None
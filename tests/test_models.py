@@ -0,0 +1,95 @@
+"""Tests of the API payload parsers."""
+
+import pytest
+
+from sunpower_maxeon.models import (
+    SYSTEM_DATA_DEFAULTS,
+    ChargingSchedule,
+    ExportLimit,
+    PowerMeter,
+    SchemaError,
+    System,
+    dump_system_data,
+    load_system_data,
+    parse_systems,
+)
+
+
+def test_power_meter_parses_numbers():
+    power = PowerMeter.from_dict(
+        {"timestamp": "1718612017", "p_pv": "1200", "p_grid": "-3.5", "p_storage": None, "unknown": 1}
+    )
+
+    assert power == PowerMeter(timestamp=1718612017, p_pv=1200, p_grid=-3.5)
+    assert isinstance(power.p_pv, int)
+
+
+def test_timestamp_in_milliseconds():
+    assert PowerMeter.from_dict({"timestamp": 1718612017123}).timestamp == 1718612017
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        None,
+        [],
+        {"p_pv": 1},
+        {"timestamp": 1718612017, "p_pv": True},
+        {"timestamp": 1718612017, "p_pv": "high"},
+        {"timestamp": 1718612017, "status": 1},
+    ],
+)
+def test_power_meter_rejects_invalid_payloads(data):
+    with pytest.raises(SchemaError):
+        PowerMeter.from_dict(data)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(True, True), (0, False), ("1", True), ("False", False)],
+)
+def test_boolean_forms(value, expected):
+    assert ExportLimit.from_dict({"enable": value}).enable is expected
+
+
+def test_schedule_times_are_normalized():
+    schedule = ChargingSchedule.from_dict({"start_time_1": "1:00", "end_time_1": "05:30:00", "max_soc": 95})
+
+    assert (schedule.start_time_1, schedule.end_time_1, schedule.max_soc) == ("01:00", "05:30", 95)
+
+
+@pytest.mark.parametrize("value", ["24:00", "1:5", "noon", 100])
+def test_schedule_rejects_invalid_times(value):
+    with pytest.raises(SchemaError):
+        ChargingSchedule.from_dict({"start_time_1": value})
+
+
+def test_parse_systems():
+    systems = parse_systems({"systems": [{"system_sn": "A", "installed_pv_power": 6.4}, {"system_sn": "B"}]})
+
+    assert [system.system_sn for system in systems] == ["A", "B"]
+    assert systems[0].installed_pv_power == 6.4
+    with pytest.raises(SchemaError):
+        parse_systems({"systems": None})
+    with pytest.raises(SchemaError):
+        parse_systems({"systems": [{"installed_pv_power": 6.4}]})
+
+
+def test_system_data_round_trip():
+    data = {
+        **SYSTEM_DATA_DEFAULTS,
+        "system_sn": "A",
+        "details": System(system_sn="A", status="Normal"),
+        "power": PowerMeter(timestamp=1718612017, p_pv=1200),
+        "energy_estimate": {"e_pv_generation": 10.6},
+    }
+
+    # Setup merges the loaded data over the defaults, as the empty meter
+    # payloads lack their required timestamp
+    assert {**SYSTEM_DATA_DEFAULTS, **load_system_data(dump_system_data(data))} == data
+
+
+def test_load_system_data_drops_keys_that_no_longer_fit():
+    loaded = load_system_data({"power": {"p_pv": 1200}, "export_limit": {"export_rate": 80}, "system_sn": "A"})
+
+    assert loaded == {"export_limit": ExportLimit(export_rate=80), "system_sn": "A"}
@@ -0,0 +1,66 @@
+"""Tests of the client-side rate limiter."""
+
+import asyncio
+import time
+
+from sunpower_maxeon.rate_limiter import PRIORITY_READ, PRIORITY_WRITE, RateLimiter
+
+
+def test_burst_is_released_at_once():
+    async def _run() -> float:
+        limiter = RateLimiter(rate=1, burst=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(_run()) < 0.1
+
+
+def test_writes_are_released_before_queued_reads():
+    async def _run() -> list[str]:
+        limiter = RateLimiter(rate=50, burst=1)
+        await limiter.acquire()
+        released = []
+
+        async def _request(name: str, priority: int) -> None:
+            await limiter.acquire(priority)
+            released.append(name)
+
+        reads = [asyncio.create_task(_request(f"read {index}", PRIORITY_READ)) for index in range(2)]
+        await asyncio.sleep(0)
+        write = asyncio.create_task(_request("write", PRIORITY_WRITE))
+        await asyncio.gather(*reads, write)
+        return released
+
+    assert asyncio.run(_run()) == ["write", "read 0", "read 1"]
+
+
+def test_defer_holds_every_request():
+    async def _run() -> float:
+        limiter = RateLimiter(rate=100, burst=10)
+        limiter.defer(0.2)
+        # A shorter Retry-After does not shorten the hold
+        limiter.defer(0.05)
+        started = time.monotonic()
+        await limiter.acquire(PRIORITY_WRITE)
+        return time.monotonic() - started
+
+    assert asyncio.run(_run()) >= 0.19
+
+
+def test_cancelled_waiter_does_not_take_a_token():
+    async def _run() -> tuple[bool, list]:
+        limiter = RateLimiter(rate=20, burst=1)
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire(PRIORITY_WRITE))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        started = time.monotonic()
+        await asyncio.wait_for(limiter.acquire(), 1)
+        # Released on the first token, not the second
+        return time.monotonic() - started < 0.09, limiter._waiters
+
+    in_time, waiters = asyncio.run(_run())
+    assert in_time
+    assert waiters == []
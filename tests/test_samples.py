@@ -0,0 +1,76 @@
+"""Tests of the power sample buffer."""
+
+from datetime import datetime, timedelta, timezone
+import math
+
+import pytest
+
+from sunpower_maxeon.models import PowerMeter
+from sunpower_maxeon.samples import PowerSampleBuffer
+
+
+def _buffer(capacity: int, *samples: tuple[int, float | None]) -> PowerSampleBuffer:
+    buffer = PowerSampleBuffer(capacity)
+    for timestamp, p_pv in samples:
+        buffer.append(PowerMeter(timestamp=timestamp, p_pv=p_pv))
+    return buffer
+
+
+def test_values_in_range():
+    buffer = _buffer(10, (1000, 1.0), (1010, 2.0), (1020, 3.0))
+
+    assert len(buffer) == 3
+    assert list(buffer.values("timestamp")) == [1000, 1010, 1020]
+    assert list(buffer.values("p_pv", since=1005)) == [2.0, 3.0]
+    assert list(buffer.values("p_pv", since=1000, until=1020)) == [1.0, 2.0]
+    assert list(buffer.values("p_pv", since=1030)) == []
+
+
+def test_wraparound_keeps_newest_samples():
+    buffer = _buffer(3, *((timestamp, float(timestamp)) for timestamp in range(1, 6)))
+
+    assert len(buffer) == 3
+    assert list(buffer.values("timestamp")) == [3, 4, 5]
+    assert buffer.first("p_pv") == 3.0
+    assert buffer.latest("p_pv") == 5.0
+    # The ring starts at the last slot, so the window wraps into two views
+    assert len(buffer.window("p_pv")) == 2
+    assert list(buffer.values("p_pv", since=4)) == [4.0, 5.0]
+
+
+def test_missing_values_are_nan():
+    buffer = _buffer(3, (1000, None))
+
+    assert math.isnan(next(buffer.values("p_pv")))
+    assert buffer.latest("p_pv") is None
+    assert PowerSampleBuffer(3).latest("p_pv") is None
+
+
+def test_energy_integrates_positive_power():
+    # 3600 W for 10 minutes, then 0 W for 10 minutes
+    buffer = _buffer(10, (0, 3600.0), (600, 3600.0), (1200, 0.0))
+
+    assert buffer.energy("p_pv", 1) == pytest.approx(0.6 + 0.3)
+    assert buffer.energy("p_pv", -1) == 0.0
+    assert buffer.energy("p_pv", 1, since=600) == pytest.approx(0.3)
+
+
+def test_energy_skips_gaps_and_missing_values():
+    # Longer than ENERGY_INTERPOLATION_MAX_GAP, then a missing value
+    buffer = _buffer(10, (0, 3600.0), (3600, 3600.0), (3900, None), (4200, 3600.0), (4500, 3600.0))
+
+    assert buffer.energy("p_pv", 1) == pytest.approx(0.3)
+
+
+def test_complete_hours_are_whole_utc_hours():
+    # From 08:20 UTC, one sample a minute
+    start = int(datetime(2026, 10, 18, 8, 20, tzinfo=timezone.utc).timestamp())
+    buffer = _buffer(300, *((start + minute * 60, 1.0) for minute in range(200)))
+    # 16:05 IST is 10:35 UTC, so the 10:00 UTC hour is not complete yet
+    now = datetime(2026, 10, 18, 16, 5, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+    hours = buffer.complete_hours(now.timestamp())
+
+    assert [datetime.fromtimestamp(hour, timezone.utc).hour for hour in hours] == [9]
+    assert not buffer.complete_hours(now.timestamp(), after=hours[-1])
+    assert not PowerSampleBuffer(3).complete_hours(now.timestamp())
@@ -0,0 +1,52 @@
+"""Tests of the versioned per-system data store."""
+
+import pytest
+
+from sunpower_maxeon.store import SystemStore
+
+
+def test_update_publishes_a_new_snapshot():
+    store = SystemStore({"system_sn": "A", "power": 1})
+    before = store.snapshot
+
+    assert store.update({"power": 2})
+    assert store.version == 1
+    assert store["power"] == 2
+    assert before == {"system_sn": "A", "power": 1}
+    with pytest.raises(TypeError):
+        store.snapshot["power"] = 3
+
+
+def test_equal_values_do_not_bump_the_version():
+    store = SystemStore({"power": 1, "energy": {"e_pv_generation": 1.5}})
+    snapshot = store.snapshot
+
+    assert not store.update({"power": 1, "energy": {"e_pv_generation": 1.5}})
+    assert not store.update({})
+    assert store.version == 0
+    assert store.snapshot is snapshot
+
+
+def test_versions_are_kept_per_key():
+    store = SystemStore({"power": 1, "energy": 1})
+
+    store.update({"power": 2})
+    store.update({"energy": 2, "power": 2})
+    store.update({"details": "new"})
+
+    assert store.version == 3
+    assert store.key_version("power") == 1
+    assert store.key_version("energy") == 2
+    assert store.key_version("details") == 3
+    assert store.key_version("system_sn") == 0
+
+
+def test_unchanged_values_are_shared():
+    energy = {"e_pv_generation": 1.5}
+    store = SystemStore({"power": 1, "energy": energy})
+
+    store.update({"power": 2})
+
+    assert store["energy"] is energy
+    assert dict(store) == {"power": 2, "energy": energy}
+    assert len(store) == 2